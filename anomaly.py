@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from config import SITE_DIVISIONS
+from validation import BAND_ICONS
+
+# --- Anomaly Settings ---
+# Entries are scored by the log growth over the previous period, as a robust
+# z-score (median / MAD) against the growth history of the same location and
+# category, and against all sites of the division reporting that category.
+OWN_KEYS = ['location', 'category', 'unit_standardized', 'month']
+PEER_KEYS = ['division', 'category', 'unit_standardized', 'month']
+ANNUAL = 0  # month key of annual entries and totals
+MIN_OBSERVATIONS = 3  # growth observations needed before a group is scored
+MAD_TO_SIGMA = 1.4826
+MIN_SCALE = 0.05  # floor of the growth spread, so perfectly steady series do not flag tiny changes
+WATCH_LIMIT = 2.0
+ANOMALY_LIMIT = 3.5
+SOURCE_LABELS = {'own': 'vs. own history', 'peers': 'vs. division peers'}
+STATS_COLUMNS = {'median': 'float64', 'scale': 'float64', 'n': 'int64'}
+
+
+def build_history_stats(annual, monthly):
+    """Precomputes growth statistics per own and peer group from approved totals.
+
+    annual and monthly are store.period_totals('Y') and ('M') frames. Growth is only
+    taken between consecutive years of the same group, so gaps in reporting do not
+    count as a single large jump. Returns {'own': frame, 'peers': frame} with the
+    median, scale and number of observations per group.
+    """
+    # Empty frames from the store carry object columns, which would leak into the result.
+    frames = [frame for frame in (annual.assign(month=ANNUAL), monthly) if not frame.empty]
+    if not frames:
+        return {'own': _empty_stats(OWN_KEYS), 'peers': _empty_stats(PEER_KEYS)}
+    history = pd.concat(frames, ignore_index=True).astype(
+        {'year': 'int64', 'month': 'int64', 'value_standardized': 'float64'}
+    )
+    history = history[history['value_standardized'] > 0].sort_values(OWN_KEYS + ['year'])
+    grouped = history.groupby(OWN_KEYS, sort=False)
+    previous_year = grouped['year'].shift()
+    previous_value = grouped['value_standardized'].shift()
+    history['growth'] = np.log(history['value_standardized'] / previous_value).where(history['year'] - previous_year == 1)
+    growth = history.dropna(subset=['growth'])
+    return {'own': _robust_stats(growth, OWN_KEYS), 'peers': _robust_stats(growth, PEER_KEYS)}
+
+
+def _robust_stats(growth, keys):
+    """Returns the median, scaled MAD and count of growth per group with enough observations."""
+    if growth.empty:
+        return _empty_stats(keys)
+    median = growth.groupby(keys)['growth'].transform('median')
+    stats = growth.assign(abs_dev=(growth['growth'] - median).abs()).groupby(keys, as_index=False).agg(
+        median=('growth', 'median'), mad=('abs_dev', 'median'), n=('growth', 'size')
+    )
+    stats['scale'] = np.maximum(stats['mad'].astype('float64') * MAD_TO_SIGMA, MIN_SCALE)
+    stats = stats.loc[stats['n'] >= MIN_OBSERVATIONS, keys + list(STATS_COLUMNS)].reset_index(drop=True)
+    return stats.astype(STATS_COLUMNS)
+
+
+def _empty_stats(keys):
+    """Returns a stats frame without groups, typed like a populated one."""
+    columns = {key: pd.Series(dtype='int64' if key == 'month' else object) for key in keys}
+    columns.update({column: pd.Series(dtype=dtype) for column, dtype in STATS_COLUMNS.items()})
+    return pd.DataFrame(columns)
+
+
+def score_anomalies(df, stats, value_col='value_standardized', prev_col='value_prev_year'):
+    """Adds 'z_own', 'z_peers', 'anomaly_score', 'anomaly_source' and 'anomaly' columns.
+
+    The score is the larger absolute z-score of the two comparisons. Rows whose
+    groups have too little history, or without a positive current and previous
+    value, get a NaN score and no band.
+    """
+    curr = df[value_col].to_numpy(dtype=float)
+    prev = df[prev_col].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where((curr > 0) & (prev > 0), np.log(curr / prev), np.nan)
+
+    location = df['location'].astype(object)
+    keys = pd.DataFrame({
+        'location': location.to_numpy(),
+        'division': location.map(SITE_DIVISIONS).to_numpy(),
+        'category': df['category'].astype(object).to_numpy(),
+        'unit_standardized': df['unit_standardized'].astype(object).to_numpy(),
+        'month': df['month'].fillna(ANNUAL).astype('int64').to_numpy(),
+    })
+    z = {}
+    for source, group_keys in (('own', OWN_KEYS), ('peers', PEER_KEYS)):
+        if stats[source].empty:
+            # No group has enough history yet, e.g. in a site's first reporting cycle.
+            z[source] = np.full(len(df), np.nan)
+            continue
+        # Group keys are unique in stats, so a left merge keeps the rows of df in order.
+        matched = keys.merge(stats[source], on=group_keys, how='left')
+        z[source] = (growth - matched['median'].to_numpy()) / matched['scale'].to_numpy()
+
+    magnitude = np.abs(np.column_stack([z['own'], z['peers']]))
+    scored_any = ~np.isnan(magnitude).all(axis=1)
+    score = np.full(len(df), np.nan)
+    score[scored_any] = np.nanmax(magnitude[scored_any], axis=1)
+    source = np.where(np.nan_to_num(magnitude[:, 1], nan=-1) > np.nan_to_num(magnitude[:, 0], nan=-1), 'peers', 'own')
+
+    out = df.copy()
+    out['z_own'] = z['own']
+    out['z_peers'] = z['peers']
+    out['anomaly_score'] = score
+    out['anomaly_source'] = np.where(scored_any, source, None)
+    out['anomaly'] = np.select(
+        [score >= ANOMALY_LIMIT, score >= WATCH_LIMIT, scored_any],
+        ['red', 'orange', 'green'],
+        default=None
+    )
+    return out
+
+
+def format_anomaly(scored):
+    """Renders the anomaly band and score as display text, e.g. '🔴 4.2σ vs. own history'."""
+    text = pd.Series('N/A', index=scored.index)
+    has_score = scored['anomaly_score'].notna()
+    text[has_score] = (
+        scored.loc[has_score, 'anomaly'].map(BAND_ICONS) + ' '
+        + scored.loc[has_score, 'anomaly_score'].map('{:.1f}σ'.format) + ' '
+        + scored.loc[has_score, 'anomaly_source'].map(SOURCE_LABELS)
+    )
+    return text
@@ -0,0 +1,41 @@
+"""Times building the anomaly statistics and scoring a manager's pending entries.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_anomaly
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from anomaly import build_history_stats, score_anomalies
+from benchmarks.bench_submit import best_of
+from benchmarks.synthetic import build_database, make_submissions
+from store import SubmissionStore
+
+HISTORY_ROWS = 1_000_000
+PENDING_SIZES = [1_000, 10_000, 100_000]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.sqlite3')
+        build_database(path, HISTORY_ROWS)
+        store = SubmissionStore(path)
+        load = lambda: build_history_stats(store.period_totals('Y', approved_only=True), store.period_totals('M', approved_only=True))
+        stats = load()
+        print(f"history stats over {HISTORY_ROWS:,} rows: {best_of(load) * 1e3:.1f} ms "
+              f"({len(stats['own']):,} own groups, {len(stats['peers']):,} peer groups)")
+
+    rng = np.random.default_rng(0)
+    print(f"{'pending rows':>12} {'scoring (ms)':>13}")
+    for n_rows in PENDING_SIZES:
+        pending = make_submissions(n_rows)
+        pending['value_prev_year'] = pending['value_standardized'] * rng.lognormal(0, 0.2, n_rows)
+        elapsed = best_of(lambda: score_anomalies(pending, stats))
+        print(f"{n_rows:>12,} {elapsed * 1e3:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
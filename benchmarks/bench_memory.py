@@ -0,0 +1,33 @@
+"""Reports bytes per row of the submissions frame with object strings vs. the compact schema.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory
+"""
+from benchmarks.synthetic import make_submissions
+from schema import enforce_schema
+
+N_ROWS = 1_000_000
+
+
+def bytes_per_column(df):
+    """Returns deep memory usage per column, in bytes per row."""
+    return df.memory_usage(index=False, deep=True) / len(df)
+
+
+def main():
+    legacy = make_submissions(N_ROWS)
+    compact = enforce_schema(legacy)
+    before = bytes_per_column(legacy)
+    after = bytes_per_column(compact)
+
+    print(f"{N_ROWS:,} rows")
+    print(f"{'column':<20} {'before':>10} {'after':>10}   dtype")
+    for column in legacy.columns:
+        print(f"{column:<20} {before[column]:>10.1f} {after[column]:>10.1f}   {legacy[column].dtype} -> {compact[column].dtype}")
+    print(f"{'total':<20} {before.sum():>10.1f} {after.sum():>10.1f}   "
+          f"({before.sum() * N_ROWS / 2**20:.0f} MiB -> {after.sum() * N_ROWS / 2**20:.0f} MiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Compares the legacy per-category concat loop with the batched submit path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_submit
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_submissions
+from config import ANNUAL_CATEGORIES_CONFIG, SITE_DIVISIONS
+from conversion import perform_conversion
+from store import SubmissionStore
+
+SIZES = [10_000, 100_000, 1_000_000]
+LOCATION = 'Colmar Site (France)'
+
+
+def make_form(n_categories=40):
+    """Builds a form with n_categories enabled, entered in the first non-standard unit where possible."""
+    form_data = {}
+    for category in list(ANNUAL_CATEGORIES_CONFIG)[:n_categories]:
+        units = list(ANNUAL_CATEGORIES_CONFIG[category]['units'])
+        form_data[category] = {'value': 123.45, 'unit': units[-1]}
+    return form_data
+
+
+def legacy_submit(data, form_data, year, username):
+    """The original submit handler: one max()+1 and one pd.concat per category."""
+    for category, entry in form_data.items():
+        if entry['value'] > 0:
+            std_val, std_unit = perform_conversion(entry['value'], entry['unit'], category)
+            new_id = data['id'].max() + 1 if not data.empty else 1
+            division = SITE_DIVISIONS.get(LOCATION)
+            new_data = pd.DataFrame([{'id': new_id, 'location': LOCATION, 'division': division, 'year': year, 'month': np.nan, 'category': category, 'value_input': entry['value'], 'unit_input': entry['unit'], 'value_standardized': std_val, 'unit_standardized': std_unit, 'status': 'Pending', 'submitted_by': username, 'approved_by': None, 'submission_date': pd.to_datetime('now')}])
+            data = pd.concat([data, new_data], ignore_index=True)
+    return data
+
+
+def best_of(fn, repeat=5):
+    """Returns the fastest wall time of fn() in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    form_data = make_form()
+    year = pd.Timestamp.now().year
+    print(f"{'rows':>10} {'legacy (ms)':>12} {'batched (ms)':>13} {'speedup':>8}")
+    for n_rows in SIZES:
+        existing = make_submissions(n_rows)
+        legacy = best_of(lambda: legacy_submit(existing, form_data, year, 'user_colmar'))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SubmissionStore(os.path.join(tmp, 'bench.sqlite3'))
+            store.insert_frame(existing)
+            batched = best_of(lambda: store.submit_form(form_data, LOCATION, year, 'user_colmar'))
+
+        print(f"{n_rows:>10,} {legacy * 1e3:>12.1f} {batched * 1e3:>13.1f} {legacy / batched:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""Drives the app headlessly with Streamlit's AppTest and reports rerun latency per page.
+
+Simulated site employees open Annual Entry and submit their form, managers open
+the validation page and commit decisions, and an administrator opens the
+overview, all concurrently against a synthetic store of each requested size.
+Results are compared against a stored baseline.
+
+AppTest is not thread-safe (it swaps Streamlit's global runtime on every run),
+so each simulated user runs in its own worker process and sends its samples
+back. Peak memory is reported per page as the highest resident set size of a
+user's process sampled while an action of that page was running. RSS is read
+from /proc, so this requires Linux.
+
+Run from the repository root:
+
+    python -m benchmarks.load_test --sizes 10000 1000000
+    python -m benchmarks.load_test --update-baseline
+
+st.data_editor cannot be edited through AppTest, so managers commit their
+decisions through SubmissionStore.set_status_many() (the call the Commit button
+makes) and the rerun that follows is timed.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import build_database
+from config import USERS
+from store import SubmissionStore
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'streamlit_app.py')
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+APP_TIMEOUT_SECONDS = 600
+RSS_SAMPLE_SECONDS = 0.01
+# Sites whose employees report one of their default categories monthly, so the
+# reporting-month path of the entry form is exercised.
+MONTHLY_CATEGORIES = {
+    'Colmar Site (France)': {'Diesel B7 (on-road vehicle)': 'Monthly'},
+    'Toulouse Site (France)': {'Kerosene': 'Monthly'},
+}
+
+
+class RssMonitor:
+    """Samples the process RSS in a background thread, keeping the peak seen while each page was running."""
+
+    def __init__(self):
+        self.peaks = defaultdict(int)
+        self._active = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    @contextmanager
+    def track(self, page):
+        """Attributes the RSS sampled during the enclosed block to page."""
+        with self._lock:
+            self._active[page] += 1
+        self._sample()
+        try:
+            yield
+        finally:
+            self._sample()
+            with self._lock:
+                self._active[page] -= 1
+
+    def _sample(self):
+        rss = _current_rss()
+        with self._lock:
+            for page, running in self._active.items():
+                if running:
+                    self.peaks[page] = max(self.peaks[page], rss)
+
+    def _run(self):
+        while not self._stop.wait(RSS_SAMPLE_SECONDS):
+            self._sample()
+
+
+def _current_rss():
+    """Returns the resident set size of this process in bytes."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def logged_in_app(username):
+    """Returns an AppTest session already logged in as username."""
+    at = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT_SECONDS)
+    at.session_state['logged_in'] = True
+    at.session_state['user_info'] = USERS[username]
+    at.session_state['username'] = username
+    return at
+
+
+def timed_run(samples, monitor, page, action):
+    """Runs an AppTest action, records its latency and memory under page and fails on app exceptions."""
+    with monitor.track(page):
+        start = time.perf_counter()
+        at = action()
+        samples.append((page, time.perf_counter() - start))
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    return at
+
+
+def employee_session(username, iterations, samples, monitor):
+    """Opens Annual Entry and submits a filled-in form, iterations times.
+
+    The reporting month is picked at random when monthly or daily categories are
+    configured for the site.
+    """
+    rng = np.random.default_rng()
+    at = logged_in_app(username)
+    timed_run(samples, monitor, 'employee.configuration', at.run)
+    for _ in range(iterations):
+        timed_run(samples, monitor, 'employee.annual_entry', lambda: at.sidebar.radio[0].set_value("Annual Entry").run())
+        for selectbox in at.selectbox:
+            if selectbox.label == "Reporting Month":
+                selectbox.set_value(int(rng.integers(1, 13)))
+        for number_input in at.number_input:
+            if number_input.key and number_input.key.startswith('val_'):
+                number_input.set_value(float(rng.uniform(1, 10_000)))
+        submit = next(b for b in at.button if b.label == "Submit Data")
+        timed_run(samples, monitor, 'employee.submit', lambda: submit.click().run())
+
+
+def manager_session(username, iterations, samples, monitor, decisions_per_commit=25):
+    """Opens the validation page and commits a batch of decisions, iterations times."""
+    store = SubmissionStore(os.environ['CARBON_PORTAL_DB'])
+    location = USERS[username]['location']
+    at = logged_in_app(username)
+    timed_run(samples, monitor, 'manager.validation', at.run)
+    year = at.selectbox[0].value
+    for _ in range(iterations):
+        pending = store.query_page({'location': location, 'year': year, 'status': 'Pending'}, limit=decisions_per_commit)
+        if not pending.empty:
+            with monitor.track('manager.commit'):
+                start = time.perf_counter()
+                store.set_status_many(dict.fromkeys(pending['id'], 'Approved'), username)
+                samples.append(('manager.commit', time.perf_counter() - start))
+        timed_run(samples, monitor, 'manager.validation', at.run)
+
+
+def admin_session(username, iterations, samples, monitor):
+    """Opens the administrator overview, iterations times."""
+    at = logged_in_app(username)
+    for _ in range(iterations):
+        timed_run(samples, monitor, 'admin.overview', at.run)
+
+
+SESSIONS = {
+    'Site Employee': employee_session,
+    'Location Manager': manager_session,
+    'Administrator': admin_session,
+}
+
+
+def run_user(username, iterations, db_path):
+    """Worker entry point: runs one simulated user in this process.
+
+    Returns its (page, seconds) samples, the peak RSS per page and the wall-clock
+    span of the session.
+    """
+    os.environ['CARBON_PORTAL_DB'] = db_path
+    samples = []
+    with RssMonitor() as monitor:
+        start = time.time()
+        SESSIONS[USERS[username]['role']](username, iterations, samples, monitor)
+        end = time.time()
+    return samples, dict(monitor.peaks), (start, end)
+
+
+def run_size(n_rows, args):
+    """Runs all simulated users concurrently against a fresh copy of an n_rows store."""
+    os.makedirs(args.data_dir, exist_ok=True)
+    template_path = os.path.join(args.data_dir, f'bench_{n_rows}.sqlite3')
+    if not os.path.exists(template_path):
+        print(f"Generating {n_rows:,} rows into {template_path}...", file=sys.stderr)
+        build_database(template_path, n_rows).checkpoint()
+
+    # Work on a copy so every run starts from the same data.
+    db_path = os.path.join(args.data_dir, 'bench_run.sqlite3')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    shutil.copyfile(template_path, db_path)
+    store = SubmissionStore(db_path)
+    for location, frequencies in MONTHLY_CATEGORIES.items():
+        store.set_entry_frequencies(location, frequencies)
+
+    employees = [u for u, info in USERS.items() if info['role'] == 'Site Employee']
+    managers = [u for u, info in USERS.items() if info['role'] == 'Location Manager']
+    users = [employees[i % len(employees)] for i in range(args.employees)]
+    users += [managers[i % len(managers)] for i in range(args.managers)]
+    users.append('admin')
+    samples, peaks, spans = [], {}, []
+    with ProcessPoolExecutor(max_workers=len(users), mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(run_user, username, args.iterations, db_path) for username in users]
+        for future in futures:
+            user_samples, user_peaks, span = future.result()
+            samples += user_samples
+            spans.append(span)
+            for page, peak in user_peaks.items():
+                peaks[page] = max(peaks.get(page, 0), peak)
+    # Measured from the first session start, so worker start-up is not counted.
+    elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+
+    results = {}
+    for page in sorted({page for page, _ in samples}):
+        latencies = np.array([seconds for p, seconds in samples if p == page])
+        results[page] = {
+            'count': len(latencies),
+            'p50_ms': round(float(np.percentile(latencies, 50)) * 1e3, 2),
+            'p95_ms': round(float(np.percentile(latencies, 95)) * 1e3, 2),
+            'throughput_per_s': round(len(latencies) / elapsed, 3),
+            'peak_rss_mib': round(peaks[page] / 2**20, 1),
+        }
+    results['peak_rss_mib'] = round(max(peaks.values(), default=0) / 2**20, 1)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints each page's p95 against the baseline and returns the regressions found."""
+    regressions = []
+    for size, pages in results.items():
+        for page, stats in pages.items():
+            if page == 'peak_rss_mib':
+                continue
+            base = baseline.get(size, {}).get(page)
+            if base is None:
+                print(f"{size:>10} {page:<24} {stats['p95_ms']:>10.1f} ms p95   {stats['peak_rss_mib']:>8.1f} MiB peak   (no baseline)")
+                continue
+            ratio = stats['p95_ms'] / base['p95_ms'] if base['p95_ms'] else float('inf')
+            flag = 'REGRESSION' if ratio > 1 + tolerance else ''
+            print(f"{size:>10} {page:<24} {stats['p95_ms']:>10.1f} ms p95   {ratio:>5.2f}x baseline {flag}")
+            if flag:
+                regressions.append((size, page, ratio))
+            base_rss = base.get('peak_rss_mib')
+            if base_rss:
+                rss_ratio = stats['peak_rss_mib'] / base_rss
+                flag = 'REGRESSION' if rss_ratio > 1 + tolerance else ''
+                print(f"{size:>10} {'':<24} {stats['peak_rss_mib']:>10.1f} MiB peak {rss_ratio:>5.2f}x baseline {flag}")
+                if flag:
+                    regressions.append((size, f"{page}.peak_rss_mib", rss_ratio))
+        base_rss = baseline.get(size, {}).get('peak_rss_mib')
+        if base_rss and pages['peak_rss_mib'] > base_rss * (1 + tolerance):
+            regressions.append((size, 'peak_rss_mib', pages['peak_rss_mib'] / base_rss))
+        print(f"{size:>10} {'peak RSS':<24} {pages['peak_rss_mib']:>10.1f} MiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--employees', type=int, default=20, help="concurrent site employees")
+    parser.add_argument('--managers', type=int, default=5, help="concurrent location managers")
+    parser.add_argument('--iterations', type=int, default=5, help="actions per simulated user")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'carbon_portal_bench'))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p95 slowdown vs. baseline")
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    results = {str(n_rows): run_size(n_rows, args) for n_rows in args.sizes}
+    print(json.dumps(results, indent=2), file=sys.stderr)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    else:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        sys.exit(f"{len(regressions)} regression(s) above {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from config import ANNUAL_CATEGORIES_CONFIG, SITE_DIVISIONS, STATUSES, USERS
+from store import SubmissionStore
+
+
+def make_submissions(n_rows, first_year=2000, last_year=None, seed=0, first_id=1, monthly_share=0.25):
+    """Generates n_rows of plausible submissions drawn from the category, site and user definitions.
+
+    A monthly_share of the rows is reported for a random month, the rest annually.
+    """
+    rng = np.random.default_rng(seed)
+    last_year = last_year or pd.Timestamp.now().year
+    categories = np.array(list(ANNUAL_CATEGORIES_CONFIG))
+    locations = np.array(list(SITE_DIVISIONS))
+    employees = _users_by_location('Site Employee')
+    managers = _users_by_location('Location Manager')
+
+    category = categories[rng.integers(0, len(categories), n_rows)]
+    location = locations[rng.integers(0, len(locations), n_rows)]
+    status = np.array(STATUSES)[rng.choice(3, n_rows, p=[0.2, 0.75, 0.05])]
+    # Every synthetic value is entered in the standard unit, so conversion is the identity.
+    standard_units = {c: config['standard_unit'] for c, config in ANNUAL_CATEGORIES_CONFIG.items()}
+    unit = pd.Series(category).map(standard_units).to_numpy()
+    value = np.round(rng.lognormal(mean=7, sigma=1.5, size=n_rows), 2)
+    loc_series = pd.Series(location)
+    month = np.where(rng.random(n_rows) < monthly_share, rng.integers(1, 13, n_rows), np.nan)
+
+    return pd.DataFrame({
+        'id': np.arange(first_id, first_id + n_rows),
+        'location': location,
+        'division': loc_series.map(SITE_DIVISIONS).to_numpy(),
+        'year': rng.integers(first_year, last_year + 1, n_rows),
+        'month': pd.array(month, dtype='Float64'),
+        'category': category,
+        'value_input': value,
+        'unit_input': unit,
+        'value_standardized': value,
+        'unit_standardized': unit,
+        'status': status,
+        'submitted_by': loc_series.map(employees).to_numpy(),
+        'approved_by': np.where(status == 'Pending', None, loc_series.map(managers).to_numpy()),
+        'submission_date': pd.Timestamp.now()
+    })
+
+
+def build_database(path, n_rows, chunk_size=1_000_000, seed=0):
+    """Fills a fresh submission store at path with n_rows synthetic rows, chunk by chunk."""
+    store = SubmissionStore(path)
+    for i, first_id in enumerate(range(1, n_rows + 1, chunk_size)):
+        size = min(chunk_size, n_rows - first_id + 1)
+        store.insert_frame(make_submissions(size, seed=seed + i, first_id=first_id))
+    return store
+
+
+def _users_by_location(role):
+    """Maps each site to the first user holding the given role there."""
+    users = {}
+    for username, info in USERS.items():
+        if info['role'] == role:
+            users.setdefault(info['location'], username)
+    return users
@@ -0,0 +1,81 @@
+# --- Category and Conversion Definitions ---
+ANNUAL_CATEGORIES_CONFIG = {
+    # Refrigerants
+    "Leakage R134a": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R22": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R290": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R32": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R404a": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R407c": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R410a": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R507": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R508b": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R600": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    "Leakage R600a": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
+    # Vehicle Fuels
+    "Diesel B0 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Diesel B0 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Diesel B7 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Diesel B7 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Diesel B30 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Diesel B30 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Gasoline E5 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Gasoline E5 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Gasoline E10 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Gasoline E10 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Ethanol E100 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "Ethanol E100 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "FAME / Diesel B100 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "FAME / Diesel B100 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "HVO100 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "HVO100 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "LPG (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    "LPG (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
+    # Industrial Processes
+    "Kerosene": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Industrial Processes & Manufacturing"},
+    "Propane": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541, "kg": 1.96}, "group": "Industrial Processes & Manufacturing"},
+    "LNG - Liquefied Natural Gas": {"standard_unit": "tonnes", "units": {"tonnes": 1, "m³": 0.45}, "group": "Industrial Processes & Manufacturing"},
+    "Acetylene": {"standard_unit": "kg", "units": {"kg": 1, "m³": 1.09}, "group": "Industrial Processes & Manufacturing"},
+    "Liquid Nitrogen": {"standard_unit": "liters", "units": {"liters": 1}, "group": "Industrial Processes & Manufacturing"},
+    "Grey Hydrogen": {"standard_unit": "kg", "units": {"kg": 1}, "group": "Industrial Processes & Manufacturing"},
+    "Green Hydrogen": {"standard_unit": "kg", "units": {"kg": 1}, "group": "Industrial Processes & Manufacturing"},
+    # Self-generated Energy
+    "Self-generated electricity (Renewable)": {"standard_unit": "MWh", "units": {"MWh": 1, "kWh": 0.001}, "group": "Self-Generated Energy"},
+    "Self-generated electricity (Non-Renewable)": {"standard_unit": "MWh", "units": {"MWh": 1, "kWh": 0.001}, "group": "Self-Generated Energy"},
+    "Self-generated heat (Renewable)": {"standard_unit": "MWh", "units": {"MWh": 1, "kWh": 0.001}, "group": "Self-Generated Energy"},
+    "Self-generated heat (Non-Renewable)": {"standard_unit": "MWh", "units": {"MWh": 1, "kWh": 0.001}, "group": "Self-Generated Energy"},
+}
+
+# --- Mock Users ---
+USERS = {
+    'user_colmar': {'role': 'Site Employee', 'location': 'Colmar Site (France)'},
+    'user_newport': {'role': 'Site Employee', 'location': 'Newport News Site (USA)'},
+    'user_toulouse': {'role': 'Site Employee', 'location': 'Toulouse Site (France)'},
+    'manager_colmar': {'role': 'Location Manager', 'location': 'Colmar Site (France)'},
+    'manager_newport': {'role': 'Location Manager', 'location': 'Newport News Site (USA)'},
+    'manager_toulouse': {'role': 'Location Manager', 'location': 'Toulouse Site (France)'},
+    'admin': {'role': 'Administrator', 'location': 'All'}
+}
+
+# --- Site Divisions ---
+# Division can be derived from location and is kept for grouping/reporting.
+SITE_DIVISIONS = {
+    'Colmar Site (France)': 'Mining Division',
+    'Newport News Site (USA)': 'Mining Division',
+    'Toulouse Site (France)': 'Aerospace Division'
+}
+
+# --- Entry Frequencies ---
+# Monthly and daily categories are stored per month; daily meter readings are
+# summed into their month on submission.
+ENTRY_FREQUENCIES = ['Annual', 'Monthly', 'Daily']
+
+# --- Submission Statuses ---
+STATUSES = ['Pending', 'Approved', 'Rejected']
+
+# --- Site Countries ---
+SITE_COUNTRIES = {
+    'Colmar Site (France)': 'France',
+    'Newport News Site (USA)': 'USA',
+    'Toulouse Site (France)': 'France'
+}
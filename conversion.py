@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from config import ANNUAL_CATEGORIES_CONFIG
+
+# --- Compiled Conversion Table ---
+# ANNUAL_CATEGORIES_CONFIG is compiled once at import time into integer codes and a
+# dense (category x unit) factor matrix so whole columns convert with one gather.
+# Row/column -1 is a padding slot of NaN so unknown codes index into it directly.
+CATEGORIES = list(ANNUAL_CATEGORIES_CONFIG)
+UNITS = sorted({unit for config in ANNUAL_CATEGORIES_CONFIG.values() for unit in config["units"]})
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+UNIT_CODES = {unit: code for code, unit in enumerate(UNITS)}
+
+FACTORS = np.full((len(CATEGORIES) + 1, len(UNITS) + 1), np.nan)
+for _category, _config in ANNUAL_CATEGORIES_CONFIG.items():
+    for _unit, _factor in _config["units"].items():
+        FACTORS[CATEGORY_CODES[_category], UNIT_CODES[_unit]] = _factor
+
+STANDARD_UNITS = np.array(
+    [ANNUAL_CATEGORIES_CONFIG[c]["standard_unit"] for c in CATEGORIES] + [None], dtype=object
+)
+
+
+def encode_categories(categories):
+    """Returns the integer category codes of a sequence, -1 for unknown categories."""
+    return pd.Categorical(categories, categories=CATEGORIES).codes
+
+
+def encode_units(units):
+    """Returns the integer unit codes of a sequence, -1 for unknown units."""
+    return pd.Categorical(units, categories=UNITS).codes
+
+
+def perform_conversion(value, unit, category):
+    """Performs unit conversion to the defined standard."""
+    config = ANNUAL_CATEGORIES_CONFIG[category]
+    if unit not in config["units"]:
+        raise ValueError(f"Unknown unit '{unit}' for category '{category}'")
+    factor = config["units"][unit]
+    standard_unit = config["standard_unit"]
+    standard_value = value * factor
+    return standard_value, standard_unit
+
+
+def convert_frame(df):
+    """Re-standardizes every row of a submissions frame in one vectorized pass.
+
+    Reads 'category', 'unit_input' and 'value_input' and returns a copy with
+    'value_standardized' and 'unit_standardized' filled in, plus a boolean mask of
+    rows whose category or unit is not defined. Those rows get a NaN value instead
+    of being passed through unconverted.
+    """
+    category_codes = encode_categories(df['category'])
+    unit_codes = encode_units(df['unit_input'])
+    factors = FACTORS[category_codes, unit_codes]
+    unknown = np.isnan(factors)
+
+    out = df.copy()
+    out['value_standardized'] = df['value_input'].to_numpy(dtype=float) * factors
+    out['unit_standardized'] = STANDARD_UNITS[category_codes]
+    return out, unknown
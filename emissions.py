@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from config import ANNUAL_CATEGORIES_CONFIG, SITE_COUNTRIES, SITE_DIVISIONS
+
+# --- Global Warming Potentials (100-year) ---
+# Refrigerant leakage in kg times its GWP gives kg CO2e. Blends are the
+# mass-weighted GWPs of their components. AR5 applies up to reporting year 2023,
+# AR6 from 2024 onwards.
+GWP_AR5 = {
+    "Leakage R134a": 1300,
+    "Leakage R22": 1760,
+    "Leakage R290": 3,
+    "Leakage R32": 677,
+    "Leakage R404a": 3943,
+    "Leakage R407c": 1624,
+    "Leakage R410a": 1924,
+    "Leakage R507": 3985,
+    "Leakage R508b": 11698,
+    "Leakage R600": 4,
+    "Leakage R600a": 3,
+}
+GWP_AR6 = {
+    "Leakage R134a": 1530,
+    "Leakage R22": 1960,
+    "Leakage R290": 0.02,
+    "Leakage R32": 771,
+    "Leakage R404a": 4728,
+    "Leakage R407c": 1908,
+    "Leakage R410a": 2256,
+    "Leakage R507": 4775,
+    "Leakage R508b": 13412,
+    "Leakage R600": 0.006,
+    "Leakage R600a": 0.006,
+}
+AR6_FROM_YEAR = 2024
+
+# --- Emission Factors (kg CO2e per standard unit) ---
+# Direct (scope 1) combustion factors; biogenic CO2 of biofuel shares is excluded.
+# Liquid nitrogen, hydrogen and renewable self-generation emit nothing on site.
+EMISSION_FACTORS = {
+    "Diesel B0 (non-road vehicle)": 2.66,
+    "Diesel B0 (on-road vehicle)": 2.66,
+    "Diesel B7 (non-road vehicle)": 2.49,
+    "Diesel B7 (on-road vehicle)": 2.49,
+    "Diesel B30 (non-road vehicle)": 1.91,
+    "Diesel B30 (on-road vehicle)": 1.91,
+    "Gasoline E5 (non-road vehicle)": 2.21,
+    "Gasoline E5 (on-road vehicle)": 2.21,
+    "Gasoline E10 (non-road vehicle)": 2.10,
+    "Gasoline E10 (on-road vehicle)": 2.10,
+    "Ethanol E100 (non-road vehicle)": 0.01,
+    "Ethanol E100 (on-road vehicle)": 0.01,
+    "FAME / Diesel B100 (non-road vehicle)": 0.17,
+    "FAME / Diesel B100 (on-road vehicle)": 0.17,
+    "HVO100 (non-road vehicle)": 0.04,
+    "HVO100 (on-road vehicle)": 0.04,
+    "LPG (non-road vehicle)": 1.56,
+    "LPG (on-road vehicle)": 1.56,
+    "Kerosene": 2.54,
+    "Propane": 1.54,
+    "LNG - Liquefied Natural Gas": 2600,
+    "Acetylene": 3.38,
+    "Liquid Nitrogen": 0,
+    "Grey Hydrogen": 0,
+    "Green Hydrogen": 0,
+    "Self-generated electricity (Renewable)": 0,
+    "Self-generated electricity (Non-Renewable)": 400,
+    "Self-generated heat (Renewable)": 0,
+    "Self-generated heat (Non-Renewable)": 200,
+}
+
+# Country-specific factors, as {(category, country): {valid_from_year: factor}}.
+# They take precedence over the global factor of the same category.
+COUNTRY_EMISSION_FACTORS = {}
+
+ANY_COUNTRY = '*'
+
+
+def _factor_table():
+    """Flattens the factor definitions into (category, country, valid_from, factor) rows."""
+    rows = [(c, ANY_COUNTRY, 0, f) for c, f in EMISSION_FACTORS.items()]
+    rows += [(c, ANY_COUNTRY, 0, gwp) for c, gwp in GWP_AR5.items()]
+    rows += [(c, ANY_COUNTRY, AR6_FROM_YEAR, gwp) for c, gwp in GWP_AR6.items()]
+    rows += [
+        (category, country, valid_from, factor)
+        for (category, country), versions in COUNTRY_EMISSION_FACTORS.items()
+        for valid_from, factor in versions.items()
+    ]
+    table = pd.DataFrame(rows, columns=['category', 'country', 'valid_from', 'kg_co2e_per_unit'])
+    return table.sort_values('valid_from', kind='stable').reset_index(drop=True)
+
+
+FACTOR_TABLE = _factor_table()
+CATEGORY_GROUPS = {category: config["group"] for category, config in ANNUAL_CATEGORIES_CONFIG.items()}
+
+
+def resolve_factors(categories, countries, years):
+    """Returns the kg CO2e factor per standard unit for aligned category/country/year arrays.
+
+    For every row the factor with the latest valid_from not after the year is used,
+    country-specific factors winning over global ones. Rows without any factor get NaN.
+    """
+    query = pd.DataFrame({
+        'row': np.arange(len(categories)),
+        'category': np.asarray(categories, dtype=object),
+        'country': np.asarray(countries, dtype=object),
+        'year': np.asarray(years, dtype='int64'),
+    }).sort_values('year', kind='stable')
+
+    factors = np.full(len(query), np.nan)
+    # Global factors first, then overwrite with country-specific ones where they exist.
+    for is_global in (True, False):
+        table = FACTOR_TABLE[(FACTOR_TABLE['country'] == ANY_COUNTRY) == is_global]
+        if table.empty:
+            continue
+        by = ['category'] if is_global else ['category', 'country']
+        matched = pd.merge_asof(
+            query, table.drop(columns='country') if is_global else table,
+            left_on='year', right_on='valid_from', by=by, direction='backward'
+        )
+        found = matched['kg_co2e_per_unit'].to_numpy()
+        rows = matched['row'].to_numpy()
+        hit = ~np.isnan(found)
+        factors[rows[hit]] = found[hit]
+    return factors
+
+
+def compute_emissions(df):
+    """Adds 'kg_co2e_per_unit' and 't_co2e' columns to a frame of standardized submissions."""
+    countries = df['location'].astype(object).map(SITE_COUNTRIES).fillna(ANY_COUNTRY)
+    factors = resolve_factors(df['category'].astype(object), countries, df['year'])
+    out = df.copy()
+    out['kg_co2e_per_unit'] = factors
+    out['t_co2e'] = df['value_standardized'].to_numpy(dtype=float) * factors / 1000
+    return out
+
+
+ROLLUP_KEYS = ['year', 'division', 'location', 'group']
+
+
+def rollup_emissions(chunks):
+    """Sums t CO2e per (year, division, location, category group) over an iterable of chunks.
+
+    Partial sums are combined chunk by chunk so the full result set never has to be
+    held in memory.
+    """
+    partials = []
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        scored = compute_emissions(chunk)
+        scored['division'] = scored['division'].astype(object).fillna(scored['location'].astype(object).map(SITE_DIVISIONS))
+        scored['group'] = scored['category'].astype(object).map(CATEGORY_GROUPS)
+        partials.append(scored.groupby(ROLLUP_KEYS, observed=True, dropna=False)['t_co2e'].sum(min_count=1))
+    if not partials:
+        return pd.DataFrame(columns=ROLLUP_KEYS + ['t_co2e'])
+    return pd.concat(partials).groupby(level=ROLLUP_KEYS, observed=True, dropna=False).sum(min_count=1).reset_index()
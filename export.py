@@ -0,0 +1,157 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+# --- Export Settings ---
+EXPORT_DIR = os.environ.get("CARBON_PORTAL_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "carbon_portal_exports"))
+EXPORT_CHUNK_SIZE = 100_000
+STALE_EXPORT_GRACE_SECONDS = 600  # older data versions stay downloadable this long
+
+EXPORT_FORMATS = {
+    'CSV': {'extension': '.csv', 'mime': 'text/csv'},
+    'Parquet': {'extension': '.parquet', 'mime': 'application/vnd.apache.parquet'},
+    'Arrow': {'extension': '.arrow', 'mime': 'application/vnd.apache.arrow.file'},
+}
+
+# Totals are read from the store's pre-computed rollups instead of raw entries.
+EXPORT_GRANULARITIES = {
+    'Entries': None,
+    'Monthly totals': 'M',
+    'Quarterly totals': 'Q',
+    'Annual totals': 'Y',
+}
+
+# Fixed so every chunk is written with the same types, even when a chunk has
+# nothing but nulls in a column.
+EXPORT_SCHEMA = pa.schema([
+    ('id', pa.int64()),
+    ('location', pa.string()),
+    ('division', pa.string()),
+    ('year', pa.int16()),
+    ('month', pa.int8()),
+    ('category', pa.string()),
+    ('value_input', pa.float64()),
+    ('unit_input', pa.string()),
+    ('value_standardized', pa.float64()),
+    ('unit_standardized', pa.string()),
+    ('status', pa.string()),
+    ('submitted_by', pa.string()),
+    ('approved_by', pa.string()),
+    ('submission_date', pa.timestamp('ns')),
+])
+
+
+def build_export(store, filters, fmt, progress=None, granularity='Entries'):
+    """Writes the submissions matching filters to an export file and returns its path.
+
+    Files are named after the filters, format, granularity and the store's data
+    version, so a given export is generated once and then served from disk to every
+    session until the data changes. Entries are streamed from the store chunk by
+    chunk; progress, if given, is called with the fraction of rows written after
+    each chunk. Other granularities export the pre-computed totals.
+    """
+    key_parts = [filters, fmt] if granularity == 'Entries' else [filters, fmt, granularity]
+    key = hashlib.sha1(json.dumps(key_parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    extension = EXPORT_FORMATS[fmt]['extension']
+    path = os.path.join(EXPORT_DIR, f"{key}_{store.version()}{extension}")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=EXPORT_DIR, suffix='.tmp')
+    os.close(fd)
+    try:
+        period_type = EXPORT_GRANULARITIES[granularity]
+        if period_type is not None:
+            approved_only = (filters or {}).get('status') == 'Approved'
+            _write_totals(store.period_totals(period_type, filters, approved_only), fmt, tmp_path)
+        else:
+            _write_entries(store, filters, fmt, tmp_path, progress)
+        # Atomic, so concurrent sessions never serve a half-written file.
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    _remove_stale(key, extension, path)
+    return path
+
+
+def _write_entries(store, filters, fmt, path, progress):
+    """Streams the matching submissions into path chunk by chunk."""
+    chunks = store.iter_chunks(filters, chunk_size=EXPORT_CHUNK_SIZE)
+    if progress is not None:
+        chunks = _report_progress(chunks, store.count(filters), progress)
+    if fmt == 'CSV':
+        _write_csv(chunks, path)
+    elif fmt == 'Parquet':
+        with pq.ParquetWriter(path, EXPORT_SCHEMA, compression='zstd') as writer:
+            for chunk in chunks:
+                writer.write_table(_to_table(chunk))
+    else:
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        with pa.ipc.new_file(path, EXPORT_SCHEMA, options=options) as writer:
+            for chunk in chunks:
+                writer.write_table(_to_table(chunk))
+
+
+def _remove_stale(key, extension, current_path):
+    """Deletes older data versions of an export once they are past the grace period.
+
+    A session may have found an older version just before it was replaced, so
+    recent files are kept for a while; they go with a later rebuild.
+    """
+    cutoff = time.time() - STALE_EXPORT_GRACE_SECONDS
+    for stale in glob.glob(os.path.join(EXPORT_DIR, f"{key}_*{extension}")):
+        try:
+            if stale != current_path and os.path.getmtime(stale) < cutoff:
+                os.remove(stale)
+        except FileNotFoundError:
+            pass  # removed concurrently by another build
+
+
+def _write_totals(df, fmt, path):
+    """Writes a (small) frame of totals in the given format."""
+    if fmt == 'CSV':
+        df.to_csv(path, index=False)
+    elif fmt == 'Parquet':
+        df.to_parquet(path, index=False, compression='zstd')
+    else:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.ipc.new_file(path, table.schema, options=pa.ipc.IpcWriteOptions(compression='zstd')) as writer:
+            writer.write_table(table)
+
+
+def _report_progress(chunks, total_rows, progress):
+    """Passes chunks through, reporting the fraction of total_rows seen after each one."""
+    done = 0
+    for chunk in chunks:
+        yield chunk
+        done += len(chunk)
+        progress(done / total_rows if total_rows else 1.0)
+
+
+def _write_csv(chunks, path):
+    """Appends chunks to a CSV file, writing the header once."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        header = True
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=header)
+            header = False
+        if header:
+            f.write(','.join(EXPORT_SCHEMA.names) + '\n')
+
+
+def _to_table(chunk):
+    """Converts a submissions chunk to an Arrow table with the export schema.
+
+    Categorical columns arrive as dictionary arrays and are cast to plain strings.
+    """
+    return pa.Table.from_pandas(chunk, preserve_index=False).cast(EXPORT_SCHEMA)
@@ -0,0 +1,134 @@
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import SITE_DIVISIONS
+from conversion import convert_frame, encode_categories
+from store import SUBMISSION_COLUMNS
+
+# --- Import Settings ---
+IMPORT_COLUMNS = ['year', 'category', 'value', 'unit']
+OPTIONAL_IMPORT_COLUMNS = ['month']  # empty for annual entries
+IMPORT_CHUNK_SIZE = 50_000
+MIN_IMPORT_YEAR = 1990
+
+
+def iter_raw_chunks(file, filename, chunk_size=IMPORT_CHUNK_SIZE):
+    """Yields the rows of an uploaded CSV or Excel file as string DataFrames of at most chunk_size rows."""
+    if filename.lower().endswith('.csv'):
+        yield from pd.read_csv(file, dtype=str, chunksize=chunk_size, skipinitialspace=True)
+    elif filename.lower().endswith(('.xlsx', '.xlsm')):
+        yield from _iter_excel_chunks(file, chunk_size)
+    else:
+        raise ValueError(f"Unsupported file type: {filename}")
+
+
+def _iter_excel_chunks(file, chunk_size):
+    """Streams the first worksheet with openpyxl's read-only mode instead of loading it whole."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else '' for h in next(rows, [])]
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) == chunk_size:
+                yield _string_frame(buffer, header)
+                buffer = []
+        if buffer:
+            yield _string_frame(buffer, header)
+    finally:
+        workbook.close()
+
+
+def _string_frame(rows, header):
+    """Builds a chunk of strings like read_csv(dtype=str) does, keeping empty cells null."""
+    df = pd.DataFrame(rows, columns=header, dtype=object)
+    return df.astype(str).where(df.notna())
+
+
+def validate_chunk(raw, location, submitted_by, first_row, max_year=None):
+    """Splits a raw chunk into submission rows to insert and rejected rows with a reason.
+
+    first_row is the 1-based line number of the chunk's first data row, used in the
+    error report so users can find the offending line in their file.
+    """
+    max_year = max_year or datetime.now().year
+    raw = raw.rename(columns=lambda c: str(c).strip().lower())
+    missing = [c for c in IMPORT_COLUMNS if c not in raw.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    category = raw['category'].str.strip()
+    unit = raw['unit'].str.strip()
+    year = pd.to_numeric(raw['year'], errors='coerce')
+    month = pd.to_numeric(raw['month'], errors='coerce') if 'month' in raw.columns else pd.Series(np.nan, index=raw.index)
+    value = pd.to_numeric(raw['value'], errors='coerce')
+
+    df = pd.DataFrame({'category': category, 'unit_input': unit, 'value_input': value})
+    df, unknown_unit = convert_frame(df)
+
+    bad_year = year.isna() | (year % 1 != 0) | (year < MIN_IMPORT_YEAR) | (year > max_year)
+    bad_category = encode_categories(category) < 0
+    bad_value = ~np.isfinite(value) | (value < 0)
+    bad_month = month.notna() & ((month % 1 != 0) | (month < 1) | (month > 12))
+    reason = np.select(
+        [bad_category, unknown_unit, bad_year.to_numpy(), bad_month.to_numpy(), bad_value.to_numpy()],
+        ['Unknown category', 'Unit not valid for category',
+         f'Year must be a whole number between {MIN_IMPORT_YEAR} and {max_year}',
+         'Month must be empty or a whole number between 1 and 12',
+         'Value must be a finite, non-negative number'],
+        default=''
+    )
+    rejected_mask = reason != ''
+
+    report_columns = IMPORT_COLUMNS + [c for c in OPTIONAL_IMPORT_COLUMNS if c in raw.columns]
+    rejected = raw.loc[rejected_mask, report_columns].copy()
+    rejected.insert(0, 'row', np.flatnonzero(rejected_mask) + first_row)
+    rejected['reason'] = reason[rejected_mask]
+
+    accepted = df.loc[~rejected_mask].copy()
+    accepted['location'] = location
+    accepted['division'] = SITE_DIVISIONS.get(location)
+    accepted['year'] = year[~rejected_mask].astype(int)
+    accepted['month'] = month[~rejected_mask].astype('Int8')
+    accepted['status'] = 'Pending'
+    accepted['submitted_by'] = submitted_by
+    accepted['approved_by'] = None
+    accepted['submission_date'] = pd.Timestamp.now()
+    return accepted[[c for c in SUBMISSION_COLUMNS if c != 'id']], rejected
+
+
+def import_file(store, file, filename, location, submitted_by, chunk_size=IMPORT_CHUNK_SIZE):
+    """Streams a site data file into the store chunk by chunk.
+
+    Accepted rows are inserted one transaction per chunk; rejected rows are appended
+    to a CSV error report on disk, so memory use is bounded by chunk_size. The
+    report is deleted again when nothing was rejected, and error_report is None.
+    """
+    fd, error_report = tempfile.mkstemp(prefix='import_errors_', suffix='.csv')
+    os.close(fd)
+    accepted_total = rejected_total = 0
+    first_row = 2  # line 1 is the header
+    try:
+        for raw in iter_raw_chunks(file, filename, chunk_size):
+            accepted, rejected = validate_chunk(raw, location, submitted_by, first_row)
+            if not accepted.empty:
+                store.insert_frame(accepted)
+            if not rejected.empty:
+                rejected.to_csv(error_report, mode='a', index=False, header=rejected_total == 0)
+            accepted_total += len(accepted)
+            rejected_total += len(rejected)
+            first_row += len(raw)
+    except BaseException:
+        os.remove(error_report)
+        raise
+    if rejected_total == 0:
+        os.remove(error_report)
+        error_report = None
+    return {'accepted': accepted_total, 'rejected': rejected_total, 'error_report': error_report}
@@ -0,0 +1,253 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import types
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from conversion import CATEGORIES, FACTORS, STANDARD_UNITS, UNITS
+from emissions import FACTOR_TABLE, rollup_emissions
+from export import build_export
+from store import SubmissionStore
+
+# --- Job Settings ---
+JOB_RESULTS_DIR = os.environ.get("CARBON_PORTAL_JOB_DIR", os.path.join(tempfile.gettempdir(), "carbon_portal_jobs"))
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    data_version INTEGER NOT NULL,
+    factors_version TEXT,
+    owner_pid INTEGER,
+    worker_pid INTEGER,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result_path TEXT,
+    submitted_by TEXT,
+    created_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_lookup ON jobs (kind, params, data_version, status);
+"""
+# Columns added after the jobs table was first released.
+JOB_MIGRATIONS = {'factors_version': 'TEXT', 'owner_pid': 'INTEGER', 'worker_pid': 'INTEGER'}
+
+
+def _factors_version():
+    """Fingerprints the conversion and emission factors compiled into this process.
+
+    Factors live in code, so changing them writes nothing to the database and
+    leaves the data version unchanged; the fingerprint keeps finished jobs from
+    being reused across such a change.
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps([CATEGORIES, UNITS, STANDARD_UNITS.tolist()]).encode())
+    digest.update(FACTORS.tobytes())
+    digest.update(FACTOR_TABLE.to_csv(index=False).encode())
+    return digest.hexdigest()[:16]
+
+
+FACTORS_VERSION = _factors_version()
+
+JOB_COLUMNS = ['id', 'kind', 'params', 'data_version', 'status', 'progress', 'message',
+               'result_path', 'submitted_by', 'created_at', 'finished_at']
+
+
+# --- Job Functions ---
+# Each runs in a worker process with its own store connection and reports progress
+# as a fraction between 0 and 1. They return (result_path or None, message).
+def _restandardize(store, params, progress):
+    changed, unknown = store.restandardize(progress=progress)
+    message = f"{changed:,} rows re-standardized"
+    if unknown:
+        message += f", {unknown:,} rows with unknown units left unchanged"
+    return None, message
+
+
+def _export(store, params, progress):
+    granularity = params.get('granularity', 'Entries')
+    path = build_export(store, params['filters'], params['format'], progress=progress, granularity=granularity)
+    return path, f"{params['format']} export ready ({granularity.lower()})"
+
+
+def _emissions_rollup(store, params, progress):
+    total = store.count({'status': 'Approved'})
+    done = 0
+
+    def chunks():
+        nonlocal done
+        for chunk in store.iter_chunks({'status': 'Approved'}):
+            yield chunk
+            done += len(chunk)
+            progress(done / total if total else 1.0)
+
+    rollup = rollup_emissions(chunks())
+    path = os.path.join(JOB_RESULTS_DIR, f"emissions_rollup_{store.version()}_{FACTORS_VERSION}.parquet")
+    rollup.to_parquet(path, index=False)
+    return path, f"{len(rollup):,} roll-up rows"
+
+
+JOB_KINDS = {
+    'restandardize': _restandardize,
+    'export': _export,
+    'emissions_rollup': _emissions_rollup,
+}
+
+
+class JobQueue:
+    """Runs heavy operations in a local process pool, with job state persisted in SQLite.
+
+    Jobs live in a 'jobs' table of the store's database, so their state and
+    results survive reruns and are visible to every session. A finished job is
+    reused when the same kind and parameters are submitted again at the same data
+    version and with the same conversion and emission factors.
+    """
+
+    def __init__(self, store, max_workers=None):
+        self.store = store
+        self.db_path = store.path
+        os.makedirs(JOB_RESULTS_DIR, exist_ok=True)
+        with _connect(self.db_path) as conn:
+            conn.executescript(JOBS_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in JOB_MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            # A queued job dies with the server process that queued it, a running
+            # one with its worker; jobs of live processes are left alone, e.g. when
+            # the queue is rebuilt after a cache clear or by another server process.
+            unfinished = conn.execute(
+                "SELECT id, status, owner_pid, worker_pid FROM jobs WHERE status IN ('Queued', 'Running')"
+            ).fetchall()
+            orphaned = [
+                (_now(), job_id) for job_id, status, owner_pid, worker_pid in unfinished
+                if not _is_alive(worker_pid if status == 'Running' else owner_pid)
+            ]
+            conn.executemany(
+                "UPDATE jobs SET status = 'Failed', message = 'Interrupted by a server restart', finished_at = ? "
+                "WHERE id = ?",
+                orphaned
+            )
+        # spawn rather than fork: the Streamlit server process runs many threads.
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def submit(self, kind, params, submitted_by):
+        """Queues a job and returns its id, or the id of an equivalent job at this data and factors version."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        params_json = json.dumps(params, sort_keys=True, default=str)
+        version = self.store.version()
+        with _connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE kind = ? AND params = ? AND data_version = ? AND factors_version = ? "
+                "AND status IN ('Queued', 'Running', 'Done') ORDER BY created_at DESC LIMIT 1",
+                (kind, params_json, version, FACTORS_VERSION)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, data_version, factors_version, owner_pid, status, submitted_by, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'Queued', ?, ?)",
+                (job_id, kind, params_json, version, FACTORS_VERSION, os.getpid(), submitted_by, _now())
+            )
+        # Workers are started on demand by submit(), so this is where they are spawned.
+        with _without_script_main():
+            self._pool.submit(_run_job, self.db_path, job_id, kind, params)
+        return job_id
+
+    def jobs(self, limit=50):
+        """Returns the most recent jobs, newest first."""
+        with _connect(self.db_path) as conn:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs ORDER BY created_at DESC LIMIT ?",
+                conn, params=[limit]
+            )
+
+    def get(self, job_id):
+        """Returns one job as a dict, or None if it does not exist."""
+        with _connect(self.db_path) as conn:
+            row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+
+
+def _run_job(db_path, job_id, kind, params):
+    """Worker entry point: runs one job and records its outcome."""
+    _update_job(db_path, job_id, status='Running', worker_pid=os.getpid())
+    try:
+        store = SubmissionStore(db_path)
+        result_path, message = JOB_KINDS[kind](
+            store, params, lambda fraction: _update_job(db_path, job_id, progress=fraction)
+        )
+    except Exception as e:
+        _update_job(db_path, job_id, status='Failed', message=f"{type(e).__name__}: {e}", finished_at=_now())
+        raise
+    _update_job(db_path, job_id, status='Done', progress=1.0, message=message,
+                result_path=result_path, finished_at=_now())
+
+
+def _update_job(db_path, job_id, **fields):
+    """Sets columns of a job row in its own short transaction."""
+    assignments = ', '.join(f"{column} = ?" for column in fields)
+    with _connect(db_path) as conn:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+
+_main_lock = threading.Lock()
+
+
+@contextmanager
+def _without_script_main():
+    """Hides the Streamlit script from worker processes spawned in the block.
+
+    Streamlit installs the app script as the __main__ module, and spawn re-runs
+    __main__ in every new worker, which would execute the whole UI there.
+    """
+    with _main_lock:
+        script_main = sys.modules['__main__']
+        sys.modules['__main__'] = types.ModuleType('__main__')
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = script_main
+
+
+def _is_alive(pid):
+    """Returns True if a process with this id is running on this host."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _connect(db_path):
+    """Opens a short-lived connection that commits on success and always closes."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _now():
+    """Returns the current local time as an ISO timestamp."""
+    return datetime.now().isoformat(timespec='seconds')
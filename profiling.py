@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# --- Profiler Settings ---
+MAX_SAMPLES = 1000  # per (page, role, section)
+DUMP_INTERVAL_SECONDS = 30
+UNKNOWN = '-'
+
+
+class Profiler:
+    """Collects timings of named sections of each script rerun, process-wide.
+
+    A rerun is started with start_rerun() and labelled with its page and role
+    once they are known; sections timed before that are labelled retroactively.
+    """
+
+    def __init__(self, dump_dir=None):
+        self.dump_dir = dump_dir
+        self._samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+        # Cumulative [count, seconds] per key, unlike the bounded sample windows.
+        self._totals = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()
+        self._last_dump = time.monotonic()
+
+    def start_rerun(self):
+        """Returns the recorder for one script run."""
+        return Rerun(self)
+
+    def record(self, page, role, section, seconds, rows=None, nbytes=None):
+        """Stores one sample; rows and nbytes are None when the section processed no frame."""
+        with self._lock:
+            self._samples[(page, role, section)].append((seconds, rows, nbytes))
+            totals = self._totals[(page, role, section)]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def summary(self):
+        """Returns p50/p95 latency, mean rows and mean frame memory per (page, role, section).
+
+        Percentiles and means cover the last MAX_SAMPLES runs; total_count and
+        total_seconds cover every run since the server started.
+        """
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+            totals = {key: tuple(value) for key, value in self._totals.items()}
+        records = []
+        for (page, role, section), samples in snapshot.items():
+            seconds = np.array([s[0] for s in samples])
+            rows = np.array([s[1] for s in samples if s[1] is not None], dtype=float)
+            nbytes = np.array([s[2] for s in samples if s[2] is not None], dtype=float)
+            records.append({
+                'page': page,
+                'role': role,
+                'section': section,
+                'count': len(samples),
+                'p50_ms': np.percentile(seconds, 50) * 1e3,
+                'p95_ms': np.percentile(seconds, 95) * 1e3,
+                'max_ms': seconds.max() * 1e3,
+                'mean_rows': rows.mean() if rows.size else np.nan,
+                'mean_bytes': nbytes.mean() if nbytes.size else np.nan,
+                'total_count': totals[(page, role, section)][0],
+                'total_seconds': totals[(page, role, section)][1],
+            })
+        columns = ['page', 'role', 'section', 'count', 'p50_ms', 'p95_ms', 'max_ms', 'mean_rows', 'mean_bytes',
+                   'total_count', 'total_seconds']
+        return pd.DataFrame(records, columns=columns).sort_values(['page', 'role', 'p95_ms'], ascending=[True, True, False])
+
+    def to_json(self):
+        """Renders the summary as a JSON document."""
+        summary = self.summary().astype(object).where(lambda df: df.notna(), None)
+        return json.dumps({'generated_at': time.time(), 'sections': summary.to_dict('records')}, indent=2)
+
+    def to_prometheus(self):
+        """Renders the summary in the Prometheus text exposition format."""
+        lines = [
+            "# HELP carbon_portal_section_seconds Wall time of a named section of a script rerun.",
+            "# TYPE carbon_portal_section_seconds summary",
+        ]
+        summary = self.summary()
+        for record in summary.itertuples(index=False):
+            labels = _labels(record)
+            lines.append(f'carbon_portal_section_seconds{{{labels},quantile="0.5"}} {record.p50_ms / 1e3:.6f}')
+            lines.append(f'carbon_portal_section_seconds{{{labels},quantile="0.95"}} {record.p95_ms / 1e3:.6f}')
+            lines.append(f'carbon_portal_section_seconds_sum{{{labels}}} {record.total_seconds:.6f}')
+            lines.append(f'carbon_portal_section_seconds_count{{{labels}}} {record.total_count}')
+        lines += [
+            "# HELP carbon_portal_section_rows Mean rows processed by a section.",
+            "# TYPE carbon_portal_section_rows gauge",
+        ]
+        for record in summary.dropna(subset=['mean_rows']).itertuples(index=False):
+            labels = _labels(record)
+            lines.append(f'carbon_portal_section_rows{{{labels}}} {record.mean_rows:.1f}')
+        lines += [
+            "# HELP carbon_portal_section_frame_bytes Mean memory of the DataFrame produced by a section.",
+            "# TYPE carbon_portal_section_frame_bytes gauge",
+        ]
+        for record in summary.dropna(subset=['mean_bytes']).itertuples(index=False):
+            labels = _labels(record)
+            lines.append(f'carbon_portal_section_frame_bytes{{{labels}}} {record.mean_bytes:.0f}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Writes metrics.json and metrics.prom to dump_dir, if one is configured."""
+        if not self.dump_dir:
+            return
+        with self._dump_lock:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            for name, content in (('metrics.json', self.to_json()), ('metrics.prom', self.to_prometheus())):
+                tmp_path = os.path.join(self.dump_dir, name + '.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, os.path.join(self.dump_dir, name))
+            self._last_dump = time.monotonic()
+
+    def maybe_dump(self):
+        """Dumps at most once every DUMP_INTERVAL_SECONDS."""
+        if time.monotonic() - self._last_dump >= DUMP_INTERVAL_SECONDS:
+            self.dump()
+
+
+class Rerun:
+    """Records the sections of a single script run.
+
+    Sections finished before label() is called are buffered and recorded with
+    the page and role it sets, or unlabelled by finish() if it is never called.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.page = UNKNOWN
+        self.role = UNKNOWN
+        self._labelled = False
+        self._buffered = []
+        self._start = time.perf_counter()
+
+    def label(self, page, role=UNKNOWN):
+        """Sets the page and role of the run and records the sections buffered so far."""
+        self.page, self.role = page, role
+        self._labelled = True
+        self._flush()
+
+    @contextmanager
+    def section(self, name):
+        """Times the enclosed block; call observe() on the yielded Section to record a frame."""
+        section = Section()
+        start = time.perf_counter()
+        try:
+            yield section
+        finally:
+            self._buffered.append((name, time.perf_counter() - start, section.rows, section.nbytes))
+            if self._labelled:
+                self._flush()
+
+    def _flush(self):
+        for sample in self._buffered:
+            self.profiler.record(self.page, self.role, *sample)
+        self._buffered = []
+
+    def finish(self):
+        """Records the total time of the run and periodically dumps the metrics files."""
+        self._flush()
+        self.profiler.record(self.page, self.role, 'total', time.perf_counter() - self._start)
+        self.profiler.maybe_dump()
+
+
+class Section:
+    """Rows and DataFrame memory observed inside a timed section."""
+
+    def __init__(self):
+        self.rows = None
+        self.nbytes = None
+
+    def observe(self, df):
+        """Records the size of a frame produced in the section and returns it unchanged."""
+        self.rows = len(df)
+        self.nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        return df
+
+
+def _labels(record):
+    """Formats the page/role/section labels of a summary record."""
+    return ",".join(f'{key}="{_escape(getattr(record, key))}"' for key in ('page', 'role', 'section'))
+
+
+def _escape(value):
+    """Escapes a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
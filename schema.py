@@ -0,0 +1,53 @@
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+from config import SITE_DIVISIONS, STATUSES, USERS
+from conversion import CATEGORIES, UNITS
+
+# --- Submission Schema ---
+# Every repeated string column is categorical over the values the portal defines,
+# so a row costs a one-byte code per column instead of a Python string object.
+LOCATIONS = list(SITE_DIVISIONS)
+DIVISIONS = sorted(set(SITE_DIVISIONS.values()))
+USERNAMES = list(USERS)
+
+SUBMISSION_DTYPES = {
+    'id': 'int64',
+    'location': CategoricalDtype(LOCATIONS),
+    'division': CategoricalDtype(DIVISIONS),
+    'year': 'int16',
+    'month': 'Int8',
+    'category': CategoricalDtype(CATEGORIES),
+    'value_input': 'float64',
+    'unit_input': CategoricalDtype(UNITS),
+    'value_standardized': 'float64',
+    'unit_standardized': CategoricalDtype(UNITS),
+    'status': CategoricalDtype(STATUSES),
+    'submitted_by': CategoricalDtype(USERNAMES),
+    'approved_by': CategoricalDtype(USERNAMES),
+    'submission_date': 'datetime64[ns]',
+}
+
+
+def enforce_schema(df, strict=True):
+    """Casts the submission columns present in df to SUBMISSION_DTYPES.
+
+    With strict=True a value outside a categorical's defined categories raises
+    ValueError instead of silently becoming missing. With strict=False (used when
+    reading back stored rows) such values are kept by extending the categories.
+    """
+    df = df.copy()
+    for column, dtype in SUBMISSION_DTYPES.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if isinstance(dtype, CategoricalDtype):
+            unknown = values.notna() & ~values.isin(dtype.categories)
+            if unknown.any():
+                if strict:
+                    raise ValueError(f"Unknown {column}: {', '.join(map(str, values[unknown].unique()))}")
+                dtype = CategoricalDtype(list(dtype.categories) + sorted(values[unknown].astype(str).unique()))
+        elif column == 'submission_date':
+            values = pd.to_datetime(values)
+        df[column] = values.astype(dtype)
+    return df
@@ -0,0 +1,546 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import ENTRY_FREQUENCIES, SITE_DIVISIONS
+from conversion import convert_frame
+from schema import enforce_schema
+
+# Compact dtypes hand numpy scalars to executemany; sqlite3 only binds Python ints.
+for _int_type in (np.int8, np.int16, np.int32, np.int64):
+    sqlite3.register_adapter(_int_type, int)
+
+# --- Schema ---
+SUBMISSION_COLUMNS = [
+    'id', 'location', 'division', 'year', 'month', 'category',
+    'value_input', 'unit_input', 'value_standardized', 'unit_standardized',
+    'status', 'submitted_by', 'approved_by', 'submission_date'
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    location TEXT NOT NULL,
+    division TEXT,
+    year INTEGER NOT NULL,
+    month INTEGER,
+    category TEXT NOT NULL,
+    value_input REAL NOT NULL,
+    unit_input TEXT NOT NULL,
+    value_standardized REAL NOT NULL,
+    unit_standardized TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Pending',
+    submitted_by TEXT,
+    approved_by TEXT,
+    submission_date TEXT NOT NULL
+);
+-- Entries are clustered by (location, year, month): every page reads one location's
+-- year or month, which SQLite resolves from this index alone.
+DROP INDEX IF EXISTS idx_submissions_location_year;
+CREATE INDEX IF NOT EXISTS idx_submissions_location_year_month ON submissions (location, year, month);
+CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions (status);
+CREATE INDEX IF NOT EXISTS idx_submissions_year_status ON submissions (year, status);
+CREATE INDEX IF NOT EXISTS idx_submissions_division ON submissions (division);
+CREATE INDEX IF NOT EXISTS idx_submissions_category ON submissions (category);
+
+-- Materialized totals, kept in step with submissions by the triggers below inside
+-- the same transaction as the write that changed them. value_total excludes
+-- rejected rows; value_approved counts approved rows only.
+CREATE TABLE IF NOT EXISTS category_year_totals (
+    location TEXT NOT NULL,
+    category TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    unit_standardized TEXT,
+    value_total REAL NOT NULL DEFAULT 0,
+    n_pending INTEGER NOT NULL DEFAULT 0,
+    n_approved INTEGER NOT NULL DEFAULT 0,
+    n_rejected INTEGER NOT NULL DEFAULT 0,
+    value_approved REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (location, category, year)
+);
+
+-- Monthly ('M', period 1-12) and quarterly ('Q', period 1-4) totals of the entries
+-- reported with a month; annual totals of all entries live in category_year_totals.
+CREATE TABLE IF NOT EXISTS category_period_totals (
+    location TEXT NOT NULL,
+    category TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    period_type TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    unit_standardized TEXT,
+    value_total REAL NOT NULL DEFAULT 0,
+    n_pending INTEGER NOT NULL DEFAULT 0,
+    n_approved INTEGER NOT NULL DEFAULT 0,
+    n_rejected INTEGER NOT NULL DEFAULT 0,
+    value_approved REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (location, category, year, period_type, period)
+);
+
+-- Bumped on every write touching a location, so cached reads can be keyed on it.
+CREATE TABLE IF NOT EXISTS location_versions (
+    location TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+
+-- How often each site reports a category; categories without a row are annual.
+CREATE TABLE IF NOT EXISTS entry_frequencies (
+    location TEXT NOT NULL,
+    category TEXT NOT NULL,
+    frequency TEXT NOT NULL,
+    PRIMARY KEY (location, category)
+);
+"""
+
+TOTAL_COLUMNS = ['value_total', 'n_pending', 'n_approved', 'n_rejected', 'value_approved']
+
+
+def _add_totals(table, keys, values):
+    """SQL adding the NEW row to the totals row identified by keys = values."""
+    return f"""
+    INSERT INTO {table} ({', '.join(keys)}, unit_standardized, {', '.join(TOTAL_COLUMNS)})
+    VALUES ({', '.join(values)}, NEW.unit_standardized,
+            CASE WHEN NEW.status = 'Rejected' THEN 0 ELSE NEW.value_standardized END,
+            NEW.status = 'Pending', NEW.status = 'Approved', NEW.status = 'Rejected',
+            CASE WHEN NEW.status = 'Approved' THEN NEW.value_standardized ELSE 0 END)
+    ON CONFLICT ({', '.join(keys)}) DO UPDATE SET
+        unit_standardized = excluded.unit_standardized,
+        {', '.join(f'{c} = {c} + excluded.{c}' for c in TOTAL_COLUMNS)};
+"""
+
+
+def _subtract_totals(table, keys, values):
+    """SQL removing the OLD row from the totals row identified by keys = values."""
+    return f"""
+    UPDATE {table} SET
+        value_total = value_total - CASE WHEN OLD.status = 'Rejected' THEN 0 ELSE OLD.value_standardized END,
+        n_pending = n_pending - (OLD.status = 'Pending'),
+        n_approved = n_approved - (OLD.status = 'Approved'),
+        n_rejected = n_rejected - (OLD.status = 'Rejected'),
+        value_approved = value_approved - CASE WHEN OLD.status = 'Approved' THEN OLD.value_standardized ELSE 0 END
+    WHERE {' AND '.join(f'{k} = {v}' for k, v in zip(keys, values))};
+"""
+
+
+def _bump_version(row):
+    return f"""
+    INSERT INTO location_versions VALUES ({row}.location, 1)
+    ON CONFLICT (location) DO UPDATE SET version = version + 1;
+"""
+
+
+def _year_keys(row):
+    return ['location', 'category', 'year'], [f'{row}.location', f'{row}.category', f'{row}.year']
+
+
+def _period_keys(row, period_type):
+    period = f'{row}.month' if period_type == 'M' else f'({row}.month + 2) / 3'
+    return (['location', 'category', 'year', 'period_type', 'period'],
+            [f'{row}.location', f'{row}.category', f'{row}.year', f"'{period_type}'", period])
+
+
+_ADD_YEAR = _add_totals('category_year_totals', *_year_keys('NEW')) + _bump_version('NEW')
+_SUBTRACT_YEAR = _subtract_totals('category_year_totals', *_year_keys('OLD')) + _bump_version('OLD')
+_ADD_PERIODS = ''.join(_add_totals('category_period_totals', *_period_keys('NEW', t)) for t in 'MQ')
+_SUBTRACT_PERIODS = ''.join(_subtract_totals('category_period_totals', *_period_keys('OLD', t)) for t in 'MQ')
+
+# Recreated on every start inside one transaction, so changes to the maintenance
+# SQL reach existing databases and no write slips through without triggers.
+TRIGGERS = {
+    'trg_submissions_insert': f"AFTER INSERT ON submissions BEGIN {_ADD_YEAR} END",
+    'trg_submissions_insert_period': f"AFTER INSERT ON submissions WHEN NEW.month IS NOT NULL BEGIN {_ADD_PERIODS} END",
+    'trg_submissions_delete': f"AFTER DELETE ON submissions BEGIN {_SUBTRACT_YEAR} END",
+    'trg_submissions_delete_period': f"AFTER DELETE ON submissions WHEN OLD.month IS NOT NULL BEGIN {_SUBTRACT_PERIODS} END",
+    'trg_submissions_update': f"AFTER UPDATE ON submissions BEGIN {_SUBTRACT_YEAR} {_ADD_YEAR} END",
+    'trg_submissions_update_old_period': f"AFTER UPDATE ON submissions WHEN OLD.month IS NOT NULL BEGIN {_SUBTRACT_PERIODS} END",
+    'trg_submissions_update_new_period': f"AFTER UPDATE ON submissions WHEN NEW.month IS NOT NULL BEGIN {_ADD_PERIODS} END",
+}
+TRIGGER_SCRIPT = "BEGIN IMMEDIATE;\n" + "".join(
+    f"DROP TRIGGER IF EXISTS {name};\nCREATE TRIGGER {name} {body};\n" for name, body in TRIGGERS.items()
+) + "COMMIT;\n"
+
+
+class SubmissionStore:
+    """Process-wide SQLite store for submissions, shared by every session."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        needs_rebuild = self._migrate(conn)
+        conn.executescript(TRIGGER_SCRIPT)
+        if needs_rebuild or conn.execute("SELECT 1 FROM category_year_totals LIMIT 1").fetchone() is None:
+            if not self.is_empty():
+                self.rebuild_totals()
+
+    def _migrate(self, conn):
+        """Upgrades tables created by earlier versions; returns True if totals must be rebuilt."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(category_year_totals)")}
+        if 'value_approved' not in columns:
+            conn.execute("ALTER TABLE category_year_totals ADD COLUMN value_approved REAL NOT NULL DEFAULT 0")
+            return True
+        return False
+
+    def _connect(self):
+        # sqlite3 connections must not be shared between threads, and Streamlit
+        # serves each session from its own script thread.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._connect(), self._write_lock)
+
+    # --- Reads ---
+    def is_empty(self):
+        """Returns True if no submission has been stored yet."""
+        row = self._connect().execute("SELECT 1 FROM submissions LIMIT 1").fetchone()
+        return row is None
+
+    def read(self, location=None, year=None, status=None):
+        """Returns the submissions matching the given filters as a DataFrame."""
+        return self.query_page({'location': location, 'year': year, 'status': status})
+
+    def count(self, filters=None):
+        """Returns the number of submissions matching the filters."""
+        where, params = _where(filters)
+        return self._connect().execute(f"SELECT COUNT(*) FROM submissions{where}", params).fetchone()[0]
+
+    def query_page(self, filters=None, sort_by='id', descending=False, limit=None, offset=0):
+        """Returns one page of the submissions matching the filters, sorted in the database.
+
+        filters maps a column to a value or a list of accepted values; None or an
+        empty list leaves that column unfiltered.
+        """
+        if sort_by not in SUBMISSION_COLUMNS:
+            raise ValueError(f"Cannot sort by '{sort_by}'")
+        where, params = _where(filters)
+        sql = (f"SELECT {', '.join(SUBMISSION_COLUMNS)} FROM submissions{where} "
+               f"ORDER BY {sort_by} {'DESC' if descending else 'ASC'}, id")
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        df = pd.read_sql_query(sql, self._connect(), params=params)
+        return _normalize_frame(df)
+
+    def iter_chunks(self, filters=None, chunk_size=100_000):
+        """Yields the submissions matching the filters in id order, chunk_size rows at a time."""
+        where, params = _where(filters)
+        sql = f"SELECT {', '.join(SUBMISSION_COLUMNS)} FROM submissions{where} ORDER BY id"
+        for df in pd.read_sql_query(sql, self._connect(), params=params, chunksize=chunk_size):
+            yield _normalize_frame(df)
+
+    def read_validation(self, location, year):
+        """Returns a location's submissions for a year with the previous year's total pre-joined.
+
+        Annual entries are compared with the previous year's total, monthly entries
+        with the same month of the previous year.
+        """
+        sql = f"""
+            SELECT {', '.join('s.' + c for c in SUBMISSION_COLUMNS)},
+                   CASE WHEN s.month IS NULL THEN p.value_total ELSE pm.value_total END AS value_prev_year
+            FROM submissions s
+            LEFT JOIN category_year_totals p
+                ON s.month IS NULL
+                AND p.location = s.location AND p.category = s.category AND p.year = s.year - 1
+                AND p.n_pending + p.n_approved > 0
+            LEFT JOIN category_period_totals pm
+                ON s.month IS NOT NULL
+                AND pm.location = s.location AND pm.category = s.category AND pm.year = s.year - 1
+                AND pm.period_type = 'M' AND pm.period = s.month
+                AND pm.n_pending + pm.n_approved > 0
+            WHERE s.location = ? AND s.year = ?
+            ORDER BY s.month, s.id
+        """
+        df = pd.read_sql_query(sql, self._connect(), params=[location, int(year)])
+        return _normalize_frame(df)
+
+    def year_over_year(self, year, location=None):
+        """Returns the (location, category) totals for a year next to the previous year's."""
+        sql = """
+            SELECT c.location, c.category, c.unit_standardized,
+                   c.value_total AS value_total, p.value_total AS value_prev_year,
+                   c.n_pending, c.n_approved, c.n_rejected
+            FROM category_year_totals c
+            LEFT JOIN category_year_totals p
+                ON p.location = c.location AND p.category = c.category AND p.year = c.year - 1
+                AND p.n_pending + p.n_approved > 0
+            WHERE c.year = ? AND c.n_pending + c.n_approved + c.n_rejected > 0
+        """
+        params = [int(year)]
+        if location is not None:
+            sql += " AND c.location = ?"
+            params.append(location)
+        return pd.read_sql_query(sql + " ORDER BY c.location, c.category", self._connect(), params=params)
+
+    def period_totals(self, period_type, filters=None, approved_only=False):
+        """Returns pre-computed totals per (location, category, year) and period.
+
+        period_type is 'Y' for annual, 'Q' for quarterly or 'M' for monthly totals;
+        quarterly and monthly totals cover only entries reported with a month.
+        filters accepts location, division, category and year like query_page().
+        """
+        filters = dict(filters or {})
+        divisions = filters.pop('division', None)
+        filters.pop('status', None)
+        if divisions:
+            divisions = divisions if isinstance(divisions, (list, tuple, set)) else [divisions]
+            locations = [loc for loc, division in SITE_DIVISIONS.items() if division in divisions]
+            if filters.get('location'):
+                requested = filters['location'] if isinstance(filters['location'], (list, tuple, set)) else [filters['location']]
+                locations = [loc for loc in locations if loc in requested]
+            # [None] matches no row, for divisions without (requested) locations.
+            filters['location'] = locations or [None]
+        where, params = _where(filters)
+        value = 'value_approved' if approved_only else 'value_total'
+        count = 'n_approved' if approved_only else 'n_pending + n_approved'
+        if period_type == 'Y':
+            sql = (f"SELECT location, category, year, unit_standardized, {value} AS value_standardized "
+                   f"FROM category_year_totals{where}")
+        else:
+            where = (where + " AND" if where else " WHERE") + " period_type = ?"
+            params.append(period_type)
+            sql = (f"SELECT location, category, year, period AS {'quarter' if period_type == 'Q' else 'month'}, "
+                   f"unit_standardized, {value} AS value_standardized FROM category_period_totals{where}")
+        sql += (" AND" if " WHERE" in sql else " WHERE") + f" {count} > 0 ORDER BY 1, 2, 3"
+        df = pd.read_sql_query(sql, self._connect(), params=params)
+        df.insert(1, 'division', df['location'].map(SITE_DIVISIONS))
+        return df
+
+    def version(self, location=None):
+        """Returns a counter that changes whenever data of the location (or any location) changes."""
+        if location is None:
+            row = self._connect().execute("SELECT COALESCE(SUM(version), 0) FROM location_versions").fetchone()
+        else:
+            row = self._connect().execute(
+                "SELECT version FROM location_versions WHERE location = ?", (location,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def entry_frequencies(self, location):
+        """Returns {category: frequency} of the categories a site does not report annually."""
+        rows = self._connect().execute(
+            "SELECT category, frequency FROM entry_frequencies WHERE location = ? AND frequency != 'Annual'",
+            (location,)
+        ).fetchall()
+        return dict(rows)
+
+    def years(self, location=None):
+        """Returns the distinct reporting years, most recent first.
+
+        Read from the yearly totals, which hold one row per (location, category,
+        year), rather than scanning the submissions.
+        """
+        sql = "SELECT DISTINCT year FROM category_year_totals WHERE n_pending + n_approved + n_rejected > 0"
+        params = []
+        if location is not None:
+            sql += " AND location = ?"
+            params.append(location)
+        rows = self._connect().execute(sql + " ORDER BY year DESC", params).fetchall()
+        return [row[0] for row in rows]
+
+    # --- Writes ---
+    def insert_frame(self, df):
+        """Inserts all rows of a submissions DataFrame in one transaction."""
+        columns = [c for c in SUBMISSION_COLUMNS if c in df.columns]
+        rows = _frame_to_rows(enforce_schema(df[columns]))
+        sql = (f"INSERT INTO submissions ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))})")
+        with self._transaction() as conn:
+            conn.executemany(sql, rows)
+
+    def submit_form(self, form_data, location, year, submitted_by):
+        """Stores every non-zero entry of an annual form as Pending in a single transaction."""
+        df = build_form_frame(form_data, location, year, submitted_by)
+        if not df.empty:
+            self.insert_frame(df)
+        return len(df)
+
+    def set_status(self, entry_id, status, approved_by):
+        """Records an approval decision for a single submission."""
+        self.set_status_many({entry_id: status}, approved_by)
+
+    def set_status_many(self, decisions, approved_by):
+        """Records {id: status} approval decisions in a single transaction."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE submissions SET status = ?, approved_by = ? WHERE id = ?",
+                [(status, approved_by, int(entry_id)) for entry_id, status in decisions.items()]
+            )
+
+    def set_entry_frequencies(self, location, frequencies):
+        """Replaces a site's {category: frequency} configuration."""
+        unknown = set(frequencies.values()) - set(ENTRY_FREQUENCIES)
+        if unknown:
+            raise ValueError(f"Unknown entry frequency: {', '.join(sorted(unknown))}")
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM entry_frequencies WHERE location = ?", (location,))
+            conn.executemany(
+                "INSERT INTO entry_frequencies (location, category, frequency) VALUES (?, ?, ?)",
+                [(location, category, frequency) for category, frequency in frequencies.items()]
+            )
+
+    def restandardize(self, chunk_size=100_000, progress=None):
+        """Recomputes value_standardized/unit_standardized of all rows from the current factors.
+
+        Works through id ranges so memory stays bounded, rewriting only rows whose
+        standardized value or unit changed; each range is its own transaction.
+        Rows with an unknown category or unit are left as they are. Returns
+        (rows changed, rows with unknown units).
+        """
+        max_id = self._connect().execute("SELECT COALESCE(MAX(id), 0) FROM submissions").fetchone()[0]
+        changed_total = unknown_total = 0
+        for low in range(0, max_id, chunk_size):
+            high = low + chunk_size
+            df = pd.read_sql_query(
+                "SELECT id, category, value_input, unit_input, value_standardized, unit_standardized "
+                "FROM submissions WHERE id > ? AND id <= ?",
+                self._connect(), params=[low, high]
+            )
+            converted, unknown = convert_frame(df)
+            changed = ~unknown & (
+                ~np.isclose(converted['value_standardized'], df['value_standardized'])
+                | (converted['unit_standardized'] != df['unit_standardized']).to_numpy()
+            )
+            if changed.any():
+                rows = converted.loc[changed, ['value_standardized', 'unit_standardized', 'id']]
+                with self._transaction() as conn:
+                    conn.executemany(
+                        "UPDATE submissions SET value_standardized = ?, unit_standardized = ? WHERE id = ?",
+                        rows.itertuples(index=False, name=None)
+                    )
+            changed_total += int(changed.sum())
+            unknown_total += int(unknown.sum())
+            if progress is not None:
+                progress(min(high, max_id) / max_id)
+        return changed_total, unknown_total
+
+    def checkpoint(self):
+        """Folds the write-ahead log back into the main database file."""
+        self._connect().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def rebuild_totals(self):
+        """Recomputes the year and period totals from scratch, e.g. after a migration."""
+        sums = """
+            MAX(unit_standardized),
+            SUM(CASE WHEN status = 'Rejected' THEN 0 ELSE value_standardized END),
+            SUM(status = 'Pending'), SUM(status = 'Approved'), SUM(status = 'Rejected'),
+            SUM(CASE WHEN status = 'Approved' THEN value_standardized ELSE 0 END)
+        """
+        totals = f"unit_standardized, {', '.join(TOTAL_COLUMNS)}"
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM category_year_totals")
+            conn.execute("DELETE FROM category_period_totals")
+            conn.execute(f"""
+                INSERT INTO category_year_totals (location, category, year, {totals})
+                SELECT location, category, year, {sums}
+                FROM submissions
+                GROUP BY location, category, year
+            """)
+            conn.execute(f"""
+                INSERT INTO category_period_totals (location, category, year, period_type, period, {totals})
+                SELECT location, category, year, 'M', month, {sums}
+                FROM submissions WHERE month IS NOT NULL
+                GROUP BY location, category, year, month
+            """)
+            conn.execute(f"""
+                INSERT INTO category_period_totals (location, category, year, period_type, period, {totals})
+                SELECT location, category, year, 'Q', (month + 2) / 3, {sums}
+                FROM submissions WHERE month IS NOT NULL
+                GROUP BY location, category, year, (month + 2) / 3
+            """)
+
+
+class _Transaction:
+    """Serializes writers and wraps them in an IMMEDIATE transaction."""
+
+    def __init__(self, conn, lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+        return False
+
+
+# --- Query Helpers ---
+FILTER_COLUMNS = ['location', 'division', 'category', 'year', 'month', 'status']
+
+
+def _where(filters):
+    """Builds a parameterized WHERE clause from a {column: value or list of values} dict."""
+    clauses, params = [], []
+    for column, value in (filters or {}).items():
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter by '{column}'")
+        if value is None:
+            continue
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        if not values:
+            continue
+        if column in ('year', 'month'):
+            values = [int(v) for v in values]
+        clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+# --- Conversion Helpers ---
+def build_form_frame(form_data, location, year, submitted_by):
+    """Turns {category: {'value', 'unit'[, 'month']}} form input into submission rows without ids.
+
+    Entries without a month are annual. Ids are allocated by the store's
+    AUTOINCREMENT sequence on insert.
+    """
+    entries = [
+        (category, data['value'], data['unit'], data.get('month'))
+        for category, data in form_data.items() if data['value'] > 0
+    ]
+    df = pd.DataFrame(entries, columns=['category', 'value_input', 'unit_input', 'month'])
+    df['value_input'] = df['value_input'].astype(float)
+    df, unknown = convert_frame(df)
+    if unknown.any():
+        bad = df.loc[unknown, ['category', 'unit_input']].itertuples(index=False)
+        raise ValueError("Unknown units: " + ", ".join(f"{unit} for {category}" for category, unit in bad))
+    df['location'] = location
+    df['division'] = SITE_DIVISIONS.get(location)
+    df['year'] = int(year)
+    df['status'] = 'Pending'
+    df['submitted_by'] = submitted_by
+    df['approved_by'] = None
+    df['submission_date'] = pd.Timestamp.now()
+    return df[[c for c in SUBMISSION_COLUMNS if c != 'id']]
+
+
+def _frame_to_rows(df):
+    """Converts a DataFrame into sqlite-friendly tuples (None for missing values)."""
+    df = df.copy()
+    if 'submission_date' in df.columns:
+        df['submission_date'] = df['submission_date'].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+def _normalize_frame(df):
+    """Restores the compact in-memory schema after a round trip through SQLite."""
+    return enforce_schema(df, strict=False)
@@ -1,8 +1,25 @@
+import calendar
+import json
+import math
+import os
+import tempfile
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from anomaly import build_history_stats, format_anomaly, score_anomalies
+from config import ANNUAL_CATEGORIES_CONFIG, ENTRY_FREQUENCIES, SITE_DIVISIONS, STATUSES, USERS
+from emissions import rollup_emissions
+from export import EXPORT_FORMATS, EXPORT_GRANULARITIES
+from importer import import_file
+from jobs import JobQueue
+from profiling import Profiler
+from schema import enforce_schema
+from store import SUBMISSION_COLUMNS, SubmissionStore
+from validation import format_plausibility, score_plausibility
+
 # --- Page Configuration ---
 st.set_page_config(
     page_title="Liebherr Carbon Tracking Portal",
@@ -10,8 +27,19 @@ st.set_page_config(
     layout="wide"
 )
 
+# --- Instrumentation ---
+METRICS_DIR = os.environ.get("CARBON_PORTAL_METRICS_DIR", os.path.join(tempfile.gettempdir(), "carbon_portal_metrics"))
+
+@st.cache_resource
+def get_profiler():
+    """Returns the process-wide profiler that collects section timings of every rerun."""
+    return Profiler(METRICS_DIR)
+
+rerun = get_profiler().start_rerun()
+
 # --- Custom CSS for Liebherr Branding ---
-st.markdown("""
+with rerun.section("css"):
+    st.markdown("""
 <style>
     /* Liebherr Color Palette */
     :root {
@@ -111,71 +139,71 @@ def initialize_database():
             ],
         'submission_date': [pd.to_datetime(now) - pd.DateOffset(years=1)] * 2 + [pd.to_datetime(now)] * 6
     }
-    df = pd.DataFrame(data)
-    df['month'] = df['month'].astype('Float64')
-    return df
-
-# --- Category and Conversion Definitions ---
-ANNUAL_CATEGORIES_CONFIG = {
-    # Refrigerants
-    "Leakage R134a": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R22": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R290": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R32": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R404a": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R407c": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R410a": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R507": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R508b": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R600": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    "Leakage R600a": {"standard_unit": "kg", "units": {"kg": 1, "lbs": 0.453592}, "group": "Refrigerants"},
-    # Vehicle Fuels
-    "Diesel B0 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Diesel B0 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Diesel B7 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Diesel B7 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Diesel B30 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Diesel B30 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Gasoline E5 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Gasoline E5 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Gasoline E10 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Gasoline E10 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Ethanol E100 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "Ethanol E100 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "FAME / Diesel B100 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "FAME / Diesel B100 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "HVO100 (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "HVO100 (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "LPG (non-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    "LPG (on-road vehicle)": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Vehicle Fuels"},
-    # Industrial Processes
-    "Kerosene": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541}, "group": "Industrial Processes & Manufacturing"},
-    "Propane": {"standard_unit": "liters", "units": {"liters": 1, "gallons (US)": 3.78541, "kg": 1.96}, "group": "Industrial Processes & Manufacturing"},
-    "LNG - Liquefied Natural Gas": {"standard_unit": "tonnes", "units": {"tonnes": 1, "m³": 0.45}, "group": "Industrial Processes & Manufacturing"},
-    "Acetylene": {"standard_unit": "kg", "units": {"kg": 1, "m³": 1.09}, "group": "Industrial Processes & Manufacturing"},
-    "Liquid Nitrogen": {"standard_unit": "liters", "units": {"liters": 1}, "group": "Industrial Processes & Manufacturing"},
-    "Grey Hydrogen": {"standard_unit": "kg", "units": {"kg": 1}, "group": "Industrial Processes & Manufacturing"},
-    "Green Hydrogen": {"standard_unit": "kg", "units": {"kg": 1}, "group": "Industrial Processes & Manufacturing"},
-    # Self-generated Energy
-    "Self-generated electricity (Renewable)": {"standard_unit": "MWh", "units": {"MWh": 1, "kWh": 0.001}, "group": "Self-Generated Energy"},
-    "Self-generated electricity (Non-Renewable)": {"standard_unit": "MWh", "units": {"MWh": 1, "kWh": 0.001}, "group": "Self-Generated Energy"},
-    "Self-generated heat (Renewable)": {"standard_unit": "MWh", "units": {"MWh": 1, "kWh": 0.001}, "group": "Self-Generated Energy"},
-    "Self-generated heat (Non-Renewable)": {"standard_unit": "MWh", "units": {"MWh": 1, "kWh": 0.001}, "group": "Self-Generated Energy"},
-}
-
-# --- Mock Users ---
-USERS = {
-    'user_colmar': {'role': 'Site Employee', 'location': 'Colmar Site (France)'},
-    'user_newport': {'role': 'Site Employee', 'location': 'Newport News Site (USA)'},
-    'user_toulouse': {'role': 'Site Employee', 'location': 'Toulouse Site (France)'},
-    'manager_colmar': {'role': 'Location Manager', 'location': 'Colmar Site (France)'},
-    'manager_newport': {'role': 'Location Manager', 'location': 'Newport News Site (USA)'},
-    'manager_toulouse': {'role': 'Location Manager', 'location': 'Toulouse Site (France)'},
-    'admin': {'role': 'Administrator', 'location': 'All'}
-}
+    return enforce_schema(pd.DataFrame(data))
+
+# --- Shared Data Store ---
+DB_PATH = os.environ.get("CARBON_PORTAL_DB", "carbon_portal.sqlite3")
+
+@st.cache_resource
+def get_store():
+    """Opens the process-wide submission store, seeding it with demo data on first use."""
+    store = SubmissionStore(DB_PATH)
+    if store.is_empty():
+        store.insert_frame(initialize_database())
+    return store
+
+with rerun.section("get_store"):
+    store = get_store()
+
+# Cached reads are keyed on the store's version counters, so a write invalidates
+# only the entries of the location it touched instead of clearing the whole cache.
+@st.cache_data(max_entries=256)
+def load_validation(location, year, version):
+    """Returns a location's entries for a year with previous-year totals pre-joined."""
+    return get_store().read_validation(location, year)
+
+@st.cache_data(max_entries=64)
+def load_year_over_year(year, version):
+    """Returns all (location, category) totals for a year next to the previous year's."""
+    return get_store().year_over_year(year)
+
+@st.cache_data(max_entries=64)
+def load_period_totals(period_type, year, version):
+    """Returns approved totals of a year per location, category and period from the rollup tables."""
+    return get_store().period_totals(period_type, {'year': year}, approved_only=True)
+
+@st.cache_data(max_entries=8)
+def load_anomaly_stats(version):
+    """Returns per-group growth statistics of approved history for anomaly scoring."""
+    store = get_store()
+    return build_history_stats(store.period_totals('Y', approved_only=True), store.period_totals('M', approved_only=True))
+
+@st.cache_resource
+def get_job_queue():
+    """Returns the process-wide background job queue."""
+    return JobQueue(get_store())
+
+@st.cache_data(max_entries=8)
+def load_emissions_rollup(version):
+    """Returns approved emissions in t CO2e per year, division, location and category group.
+
+    Factors apply per category and year, so the approved yearly totals give the same
+    result as the individual rows at the cost of one row per group.
+    """
+    return rollup_emissions([get_store().period_totals('Y', approved_only=True)])
+
+EXPORT_POLL_SECONDS = 2
+
+@st.fragment(run_every=EXPORT_POLL_SECONDS)
+def show_export_progress(job_id):
+    """Polls a queued or running export job and reruns the page once it has finished."""
+    export_job = get_job_queue().get(job_id)
+    if export_job['status'] in ('Queued', 'Running'):
+        st.progress(export_job['progress'], text=f"Building export... {export_job['progress']:.0%}")
+    else:
+        st.rerun()
 
 # --- Session State Initialization ---
-if 'data' not in st.session_state: st.session_state.data = initialize_database()
 if 'logged_in' not in st.session_state: st.session_state.logged_in = False
 if 'user_info' not in st.session_state: st.session_state.user_info = None
 if 'annual_config' not in st.session_state:
@@ -185,17 +213,9 @@ if 'annual_config' not in st.session_state:
         'Toulouse Site (France)': ["Leakage R134a", "Kerosene"]
     }
 
-# --- Utility Functions ---
-def perform_conversion(value, unit, category):
-    """Performs unit conversion to the defined standard."""
-    config = ANNUAL_CATEGORIES_CONFIG[category]
-    factor = config["units"].get(unit, 1)
-    standard_unit = config["standard_unit"]
-    standard_value = value * factor
-    return standard_value, standard_unit
-
 # --- User Interface ---
 if not st.session_state.logged_in:
+    rerun.label("Login")
     st.image("liebherr.png", width=300)
     st.title("Welcome to the Carbon Tracking Portal 🏗️")
     username = st.selectbox("Select your username", list(USERS.keys()))
@@ -218,6 +238,9 @@ else:
         page_selection = "Overview"
         if role == 'Site Employee':
             page_selection = st.radio("Navigation", ["Annual Configuration", "Annual Entry"])
+        elif role == 'Administrator':
+            page_selection = st.radio("Navigation", ["Overview", "Background Jobs", "Diagnostics"])
+        rerun.label(page_selection, role)
         
         if st.button("Log Out"):
             for key in list(st.session_state.keys()): del st.session_state[key]
@@ -226,11 +249,13 @@ else:
     if role == 'Site Employee':
         if page_selection == "Annual Configuration":
             st.title(f"⚙️ Annual Configuration for {user_info['location']}")
-            st.info("Enable the categories for which you need to enter data once a year.")
+            st.info("Enable the categories you report on and choose how often each one is entered.")
             location = user_info['location']
             current_selection = st.session_state.annual_config.get(location, [])
+            current_frequency = store.entry_frequencies(location)
             
             toggled_fields = []
+            field_frequency = {}
             
             group_order = ["Refrigerants", "Vehicle Fuels", "Industrial Processes & Manufacturing", "Self-Generated Energy"]
 
@@ -239,57 +264,103 @@ else:
                     items_in_group = {item: config for item, config in ANNUAL_CATEGORIES_CONFIG.items() if config.get("group") == group}
                     
                     for field in items_in_group:
-                        is_active = st.toggle(field, value=(field in current_selection), key=field)
+                        cols = st.columns([3, 1])
+                        is_active = cols[0].toggle(field, value=(field in current_selection), key=field)
+                        frequency = cols[1].selectbox(
+                            "Frequency", ENTRY_FREQUENCIES, key=f"freq_{field}", label_visibility="collapsed",
+                            index=ENTRY_FREQUENCIES.index(current_frequency.get(field, 'Annual')), disabled=not is_active
+                        )
                         if is_active:
                             toggled_fields.append(field)
+                            field_frequency[field] = frequency
 
             if st.button("Save Configuration", type="primary"):
                 st.session_state.annual_config[location] = toggled_fields
+                store.set_entry_frequencies(location, field_frequency)
                 st.success("Configuration saved!")
 
         elif page_selection == "Annual Entry":
             st.title(f"🗓️ Annual Entry for {user_info['location']}")
             active_fields = st.session_state.annual_config.get(user_info['location'], [])
-            if not active_fields:
+            frequencies = store.entry_frequencies(user_info['location'])
+            entry_mode = st.radio("Entry Mode", ["Form", "Bulk Upload"], horizontal=True)
+            if entry_mode == "Bulk Upload":
+                st.info("Upload a CSV or Excel file with the columns year, category, value and unit, and optionally "
+                        "month (empty for annual values). Valid rows are stored as Pending; invalid rows are listed in an error report.")
+                uploaded_file = st.file_uploader("Site data file", type=["csv", "xlsx"])
+                if uploaded_file is not None and st.button("Import File", type="primary"):
+                    with st.spinner("Importing..."):
+                        try:
+                            st.session_state.import_result = import_file(store, uploaded_file, uploaded_file.name, user_info['location'], username)
+                        except ValueError as e:
+                            st.session_state.import_result = None
+                            st.error(str(e))
+
+                import_result = st.session_state.get('import_result')
+                if import_result:
+                    st.success(f"{import_result['accepted']} rows imported for validation.")
+                    if import_result['rejected']:
+                        st.warning(f"{import_result['rejected']} rows were rejected.")
+                        with open(import_result['error_report'], 'rb') as error_report:
+                            st.download_button("📥 Download Error Report", error_report, "import_errors.csv", "text/csv")
+            elif not active_fields:
                 st.warning("No annual fields are configured. Go to the 'Annual Configuration' page to select them.")
             else:
                 with st.form("annual_data_form"):
-                    year = st.selectbox("Reporting Year", [datetime.now().year, datetime.now().year - 1], index=0)
+                    period_cols = st.columns(2)
+                    year = period_cols[0].selectbox("Reporting Year", [datetime.now().year, datetime.now().year - 1], index=0)
+                    month = None
+                    if any(frequencies.get(field, 'Annual') != 'Annual' for field in active_fields):
+                        month = period_cols[1].selectbox(
+                            "Reporting Month", range(1, 13), index=datetime.now().month - 1,
+                            format_func=calendar.month_name.__getitem__, help="Applies to monthly and daily categories."
+                        )
                     st.divider()
                     
                     form_data = {}
+                    daily_fields = [field for field in active_fields if frequencies.get(field) == 'Daily']
                     for field in active_fields:
+                        if field in daily_fields:
+                            continue
                         config = ANNUAL_CATEGORIES_CONFIG[field]
                         cols = st.columns([2, 1])
                         value = cols[0].number_input(f"{field}", min_value=0.0, format="%.2f", key=f"val_{field}")
                         unit = cols[1].selectbox("Unit", list(config["units"].keys()), key=f"unit_{field}")
-                        form_data[field] = {'value': value, 'unit': unit}
-
-                    if st.form_submit_button("Submit Annual Data", type="primary"):
-                        for category, data in form_data.items():
-                            if data['value'] > 0:
-                                std_val, std_unit = perform_conversion(data['value'], data['unit'], category)
-                                new_id = st.session_state.data['id'].max() + 1 if not st.session_state.data.empty else 1
-                                # Add division back for potential reporting, can be derived from location
-                                division_map = {
-                                    'Colmar Site (France)': 'Mining Division',
-                                    'Newport News Site (USA)': 'Mining Division',
-                                    'Toulouse Site (France)': 'Aerospace Division'
-                                }
-                                division = division_map.get(user_info['location'])
-                                new_data = pd.DataFrame([{'id': new_id, 'location': user_info['location'], 'division': division, 'year': year, 'month': np.nan, 'category': category, 'value_input': data['value'], 'unit_input': data['unit'], 'value_standardized': std_val, 'unit_standardized': std_unit, 'status': 'Pending', 'submitted_by': username, 'approved_by': None, 'submission_date': pd.to_datetime('now')}])
-                                st.session_state.data = pd.concat([st.session_state.data, new_data], ignore_index=True)
-                        st.success("Annual data submitted for validation!")
+                        form_data[field] = {'value': value, 'unit': unit, 'month': month if frequencies.get(field) == 'Monthly' else None}
+
+                    if daily_fields:
+                        st.subheader("Daily Meter Readings")
+                        st.caption("Readings are summed into the reporting month; days beyond the end of the month are ignored.")
+                        unit_cols = st.columns(len(daily_fields))
+                        daily_units = {
+                            field: unit_cols[i].selectbox(f"Unit · {field}", list(ANNUAL_CATEGORIES_CONFIG[field]["units"].keys()), key=f"unit_{field}")
+                            for i, field in enumerate(daily_fields)
+                        }
+                        daily_readings = st.data_editor(
+                            pd.DataFrame(0.0, index=pd.RangeIndex(1, 32, name='Day'), columns=daily_fields),
+                            key="daily_readings",
+                            use_container_width=True,
+                            column_config={field: st.column_config.NumberColumn(field, min_value=0.0, format="%.2f") for field in daily_fields},
+                        )
+
+                    if st.form_submit_button("Submit Data", type="primary"):
+                        if daily_fields:
+                            month_totals = daily_readings.loc[:calendar.monthrange(year, month)[1]].fillna(0).sum()
+                            for field in daily_fields:
+                                form_data[field] = {'value': float(month_totals[field]), 'unit': daily_units[field], 'month': month}
+                        with rerun.section("submit_form"):
+                            store.submit_form(form_data, user_info['location'], year, username)
+                        st.success("Data submitted for validation!")
                 
                 st.header("Submission History")
-                location_data = st.session_state.data[st.session_state.data['location'] == user_info['location']].copy()
+                available_years = store.years(location=user_info['location'])
                 
-                if not location_data.empty:
-                    available_years = sorted(location_data['year'].unique(), reverse=True)
+                if available_years:
                     selected_year_for_history = st.selectbox("Filter history by year", available_years, key="history_year_filter")
                     
-                    filtered_history = location_data[location_data['year'] == selected_year_for_history]
-                    st.dataframe(filtered_history[['year', 'category', 'value_input', 'unit_input', 'status']].sort_values(by=['category']), hide_index=True, use_container_width=True)
+                    with rerun.section("load_history") as section:
+                        filtered_history = section.observe(store.read(location=user_info['location'], year=selected_year_for_history))
+                    st.dataframe(filtered_history[['year', 'month', 'category', 'value_input', 'unit_input', 'status']].sort_values(by=['category', 'month'], key=lambda c: c.astype(str)), hide_index=True, use_container_width=True)
                 else:
                     st.info("No submission history available for this location.")
 
@@ -299,96 +370,200 @@ else:
 
         reporting_year = st.selectbox(
             "Select Reporting Year",
-            options=sorted(st.session_state.data['year'].unique(), reverse=True),
+            options=store.years(),
             index=0
         )
 
-        location_data = st.session_state.data[st.session_state.data['location'] == user_info['location']].copy()
-        current_year_data = location_data[location_data['year'] == reporting_year].reset_index()
-        previous_year_data = location_data[location_data['year'] == reporting_year - 1]
-        previous_year_values = previous_year_data[['location', 'category', 'value_standardized']].rename(
-            columns={'value_standardized': 'value_prev_year'}
-        )
-        validation_df = pd.merge(
-            current_year_data,
-            previous_year_values,
-            on=['location', 'category'],
-            how='left'
-        )
+        with rerun.section("load_validation") as section:
+            validation_df = section.observe(load_validation(user_info['location'], reporting_year, store.version(user_info['location'])))
 
         st.header(f"Entries for {reporting_year}")
 
         if validation_df.empty:
             st.info(f"No data submitted for {reporting_year} yet.")
         else:
-            # Display header row
-            c1, c2, c3, c4, c5 = st.columns([4, 2, 2, 2, 3])
-            c1.write("**Category**")
-            c2.write(f"**Value {reporting_year}**")
-            c3.write(f"**Value {reporting_year - 1}**")
-            c4.write("**Plausibility**")
-            c5.write("**Actions / Status**")
-            st.divider()
-
-            for index, row in validation_df.iterrows():
-                with st.container():
-                    c1, c2, c3, c4, c5 = st.columns([4, 2, 2, 2, 3])
-                    
-                    with c1:
-                        st.write(row['category'])
-                    
-                    with c2:
-                        st.write(f"{row['value_standardized']:.2f} {row['unit_standardized']}")
-                    
-                    with c3:
-                        if pd.notna(row['value_prev_year']):
-                            st.write(f"{row['value_prev_year']:.2f} {row['unit_standardized']}")
-                        else:
-                            st.write("N/A")
-
-                    with c4:
-                        if pd.notna(row['value_prev_year']):
-                            prev_val = row['value_prev_year']
-                            curr_val = row['value_standardized']
-                            if prev_val == 0:
-                                plausibility_text = "N/A"
-                                color = "grey"
-                            else:
-                                diff = ((curr_val - prev_val) / prev_val) * 100
-                                plausibility_text = f"{diff:+.1f}%"
-                                if abs(diff) < 10:
-                                    color = "green"
-                                elif abs(diff) <= 25:
-                                    color = "orange"
-                                else:
-                                    color = "red"
-                            st.markdown(f'<p style="color:{color}; font-weight: bold;">{plausibility_text}</p>', unsafe_allow_html=True)
-                        else:
-                            st.write("N/A")
-
-                    with c5:
-                        if row['status'] == 'Pending':
-                            button_cols = st.columns(2)
-                            if button_cols[0].button("Approve", key=f"approve_{row['id']}", type="primary", use_container_width=True):
-                                st.session_state.data.loc[st.session_state.data['id'] == row['id'], ['status', 'approved_by']] = ['Approved', username]
-                                st.rerun()
-                            if button_cols[1].button("Reject", key=f"reject_{row['id']}", use_container_width=True):
-                                st.session_state.data.loc[st.session_state.data['id'] == row['id'], ['status', 'approved_by']] = ['Rejected', username]
-                                st.rerun()
-                        else:
-                            st.write(f"_{row['status']} by {row['approved_by']}_")
-                st.divider()
+            with rerun.section("score_plausibility"):
+                scored = score_plausibility(validation_df)
+            with rerun.section("score_anomalies"):
+                # Peer statistics span every location, so they follow the global version.
+                scored = score_anomalies(scored, load_anomaly_stats(store.version()))
+            anomalous_first = st.toggle("Most anomalous first", help="Anomaly scores are robust z-scores of the change against the entry's own multi-year history and against sites of the same division.")
+            if anomalous_first:
+                scored = scored.sort_values('anomaly_score', ascending=False, na_position='last')
+            decisions_grid = pd.DataFrame({
+                'id': scored['id'],
+                'Category': scored['category'],
+                'Month': scored['month'].map(dict(enumerate(calendar.month_abbr))).astype(object).fillna('Annual'),
+                f'Value {reporting_year}': scored['value_standardized'].map('{:.2f}'.format) + ' ' + scored['unit_standardized'].astype(str),
+                f'Value {reporting_year - 1}': (scored['value_prev_year'].map('{:.2f}'.format) + ' ' + scored['unit_standardized'].astype(str)).where(scored['value_prev_year'].notna(), 'N/A'),
+                'Plausibility': format_plausibility(scored),
+                'Anomaly': format_anomaly(scored),
+                'Status': scored['status'].astype(str).where(scored['status'] == 'Pending', scored['status'].astype(str) + ' by ' + scored['approved_by'].astype(str)),
+                'Decision': None,
+            })
+            edited_grid = st.data_editor(
+                decisions_grid,
+                key=f"decisions_{reporting_year}_{anomalous_first}_{st.session_state.get('decisions_version', 0)}",
+                hide_index=True,
+                use_container_width=True,
+                disabled=[c for c in decisions_grid.columns if c != 'Decision'],
+                column_config={
+                    'id': None,
+                    'Decision': st.column_config.SelectboxColumn("Decision", options=["Approve", "Reject"]),
+                },
+            )
+
+            # Decisions on entries that are no longer pending are ignored.
+            pending_ids = set(scored.loc[scored['status'] == 'Pending', 'id'])
+            decided = edited_grid[edited_grid['Decision'].notna() & edited_grid['id'].isin(pending_ids)]
+            if st.button(f"Commit {len(decided)} Decision(s)", type="primary", disabled=decided.empty):
+                statuses = decided['Decision'].map({'Approve': 'Approved', 'Reject': 'Rejected'})
+                with rerun.section("commit_decisions"):
+                    store.set_status_many(dict(zip(decided['id'], statuses)), username)
+                st.session_state.decisions_version = st.session_state.get('decisions_version', 0) + 1
+                st.rerun()
         
         st.divider()
         st.header("📦 Export Validated Data")
-        approved_data = st.session_state.data[(st.session_state.data['status'] == 'Approved')].copy()
-        if approved_data.empty: st.warning("No approved data available.")
+        export_cols = st.columns([2, 2, 2, 2, 1])
+        export_filters = {
+            'status': 'Approved',
+            'year': export_cols[0].multiselect("Year", store.years(), key="export_year"),
+            'location': export_cols[1].multiselect("Location", list(SITE_DIVISIONS), key="export_location"),
+            'division': export_cols[2].multiselect("Division", sorted(set(SITE_DIVISIONS.values())), key="export_division"),
+        }
+        export_granularity = export_cols[3].selectbox("Granularity", list(EXPORT_GRANULARITIES), key="export_granularity")
+        export_format = export_cols[4].selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+        with rerun.section("count_approved"):
+            approved_count = store.count(export_filters)
+        if approved_count == 0: st.warning("No approved data available.")
         else:
-            st.dataframe(approved_data, use_container_width=True, hide_index=True)
-            csv = approved_data.to_csv(index=False).encode('utf-8')
-            st.download_button("📥 Download as CSV", csv, "liebherr_approved_data.csv", "text/csv", type="primary")
+            st.caption(f"{approved_count:,} approved rows. Preview of the first 100:")
+            if export_granularity == 'Entries':
+                export_preview = store.query_page(export_filters, limit=100)
+            else:
+                export_preview = store.period_totals(EXPORT_GRANULARITIES[export_granularity], export_filters, approved_only=True).head(100)
+            st.dataframe(export_preview, use_container_width=True, hide_index=True)
+            if st.button("Prepare Export"):
+                with rerun.section("submit_export_job"):
+                    export_params = {'filters': export_filters, 'format': export_format, 'granularity': export_granularity}
+                    st.session_state.export_job_id = get_job_queue().submit('export', export_params, username)
+            export_job = get_job_queue().get(st.session_state.get('export_job_id'))
+            if export_job:
+                if export_job['status'] in ('Queued', 'Running'):
+                    show_export_progress(export_job['id'])
+                elif export_job['status'] == 'Failed':
+                    st.error(f"Export failed: {export_job['message']}")
+                else:
+                    job_format = json.loads(export_job['params'])['format']
+                    file_format = EXPORT_FORMATS[job_format]
+                    # Older data versions are cleaned up by later builds, possibly in between.
+                    try:
+                        with open(export_job['result_path'], 'rb') as export_file:
+                            st.download_button(f"📥 Download as {job_format}", export_file, "liebherr_approved_data" + file_format['extension'], file_format['mime'], type="primary")
+                    except FileNotFoundError:
+                        st.info("This export has been replaced by a newer version. Prepare it again to download the current data.")
             
     elif role == 'Administrator':
-        st.title("Administrator Overview")
-        st.dataframe(st.session_state.data, use_container_width=True, hide_index=True)
+        if page_selection == "Background Jobs":
+            st.title("⏳ Background Jobs")
+            st.info("Heavy operations run in separate worker processes. Finished results are reused until the data changes.")
+            job_queue = get_job_queue()
+            job_cols = st.columns(3)
+            if job_cols[0].button("Re-standardize History", use_container_width=True):
+                job_queue.submit('restandardize', {}, username)
+            if job_cols[1].button("Compute Emission Roll-ups", use_container_width=True):
+                job_queue.submit('emissions_rollup', {}, username)
+            with job_cols[2].popover("Build Multi-Year Export", use_container_width=True):
+                job_years = st.multiselect("Years", store.years(), key="job_export_years")
+                job_format = st.selectbox("Format", list(EXPORT_FORMATS), key="job_export_format")
+                if st.button("Submit Export Job", type="primary"):
+                    job_queue.submit('export', {'filters': {'status': 'Approved', 'year': job_years}, 'format': job_format}, username)
+
+            st.button("Refresh", key="refresh_jobs")
+            recent_jobs = job_queue.jobs()
+            st.dataframe(
+                recent_jobs[['kind', 'status', 'progress', 'message', 'submitted_by', 'created_at', 'finished_at']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={'progress': st.column_config.ProgressColumn("Progress", min_value=0, max_value=1)}
+            )
+            finished_jobs = recent_jobs[(recent_jobs['status'] == 'Done') & recent_jobs['result_path'].notna()]
+            finished_jobs = finished_jobs[finished_jobs['result_path'].map(os.path.exists)]
+            if not finished_jobs.empty:
+                job_labels = finished_jobs['kind'] + ' · ' + finished_jobs['finished_at']
+                picked = st.selectbox("Download result", finished_jobs.index, format_func=job_labels.get)
+                result_path = finished_jobs.loc[picked, 'result_path']
+                try:
+                    with open(result_path, 'rb') as result_file:
+                        st.download_button("📥 Download Result", result_file, os.path.basename(result_path))
+                except FileNotFoundError:
+                    st.info("This result has been removed in the meantime. Refresh the list.")
+        elif page_selection == "Diagnostics":
+            st.title("🩺 Diagnostics")
+            profiler = get_profiler()
+            st.info("Section timings of recent reruns in this server process, per page and role.")
+            st.dataframe(profiler.summary(), use_container_width=True, hide_index=True)
+            diag_cols = st.columns(3)
+            diag_cols[0].download_button("📥 Metrics as JSON", profiler.to_json(), "metrics.json", "application/json")
+            diag_cols[1].download_button("📥 Metrics as Prometheus Text", profiler.to_prometheus(), "metrics.prom", "text/plain")
+            if diag_cols[2].button("Write Metrics Files"):
+                profiler.dump()
+                st.success(f"Metrics written to {METRICS_DIR}")
+        else:
+            st.title("Administrator Overview")
+            available_years = store.years()
+            if available_years:
+                overview_year = st.selectbox("Reporting Year", available_years, index=0)
+                st.header(f"Totals {overview_year} vs. {overview_year - 1}")
+                with rerun.section("year_over_year") as section:
+                    st.dataframe(section.observe(load_year_over_year(overview_year, store.version())), use_container_width=True, hide_index=True)
+
+                st.header(f"Quarterly Totals {overview_year}")
+                with rerun.section("quarterly_totals") as section:
+                    quarterly = section.observe(load_period_totals('Q', overview_year, store.version()))
+                if quarterly.empty:
+                    st.info(f"No approved monthly entries for {overview_year}.")
+                else:
+                    st.dataframe(
+                        quarterly.pivot_table(index=['location', 'category', 'unit_standardized'], columns='quarter',
+                                              values='value_standardized', aggfunc='sum').add_prefix('Q').reset_index(),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+
+                st.header(f"🌍 Emissions {overview_year}")
+                with rerun.section("emissions_rollup") as section:
+                    emissions_rollup = section.observe(load_emissions_rollup(store.version()))
+                year_emissions = emissions_rollup[emissions_rollup['year'] == overview_year]
+                rollup_level = st.radio("Group by", ["division", "location", "group"], horizontal=True)
+                st.metric("Total approved emissions", f"{year_emissions['t_co2e'].sum():,.1f} t CO2e")
+                st.dataframe(
+                    year_emissions.groupby(rollup_level, as_index=False)['t_co2e'].sum().sort_values('t_co2e', ascending=False),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            st.header("All Submissions")
+            filter_cols = st.columns(5)
+            filters = {
+                'location': filter_cols[0].multiselect("Location", list(SITE_DIVISIONS)),
+                'division': filter_cols[1].multiselect("Division", sorted(set(SITE_DIVISIONS.values()))),
+                'category': filter_cols[2].multiselect("Category", list(ANNUAL_CATEGORIES_CONFIG)),
+                'year': filter_cols[3].multiselect("Year", available_years),
+                'status': filter_cols[4].multiselect("Status", STATUSES),
+            }
+            sort_cols = st.columns([3, 1, 1, 1])
+            sort_by = sort_cols[0].selectbox("Sort by", SUBMISSION_COLUMNS)
+            descending = sort_cols[1].toggle("Descending", value=True)
+            page_size = sort_cols[2].selectbox("Rows per page", [25, 50, 100, 250], index=1)
+
+            with rerun.section("count_submissions"):
+                total_rows = store.count(filters)
+            page_count = max(1, math.ceil(total_rows / page_size))
+            page = sort_cols[3].number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+            with rerun.section("query_page") as section:
+                page_data = section.observe(store.query_page(filters, sort_by, descending, limit=page_size, offset=(page - 1) * page_size))
+            st.dataframe(page_data, use_container_width=True, hide_index=True)
+            st.caption(f"{total_rows:,} submissions · page {page} of {page_count}")
 
+rerun.finish()
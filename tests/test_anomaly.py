@@ -0,0 +1,77 @@
+"""Checks the anomaly statistics and scoring, including stores without approved history.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomaly import build_history_stats, score_anomalies
+from schema import enforce_schema
+
+TOTALS_COLUMNS = ['location', 'division', 'category', 'year', 'unit_standardized', 'value_standardized']
+COLMAR = 'Colmar Site (France)'
+NEWPORT = 'Newport News Site (USA)'
+
+
+def totals(rows, month=False):
+    """Builds a period_totals()-like frame; without rows it has object columns, as the store returns."""
+    columns = TOTALS_COLUMNS[:4] + (['month'] if month else []) + TOTALS_COLUMNS[4:]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def steady_history(location, years, value=1000.0, growth=1.05, month=None):
+    """Kerosene totals of a site growing by a steady factor per year."""
+    division = 'Mining Division'
+    return [
+        (location, division, 'Kerosene', year) + (() if month is None else (month,)) + ('liters', value * growth ** i)
+        for i, year in enumerate(years)
+    ]
+
+
+def pending(rows):
+    """Builds manager-page rows from (location, month, value, value_prev_year) tuples."""
+    df = pd.DataFrame(rows, columns=['location', 'month', 'value_standardized', 'value_prev_year'])
+    df['category'] = 'Kerosene'
+    df['unit_standardized'] = 'liters'
+    df['month'] = df['month'].astype('Int8')
+    return enforce_schema(df)
+
+
+def test_empty_history_scores_nothing():
+    stats = build_history_stats(totals([]), totals([], month=True))
+    assert stats['own'].empty and stats['peers'].empty
+    scored = score_anomalies(pending([(COLMAR, None, 1200.0, 1000.0)]), stats)
+    assert scored['anomaly_score'].isna().all()
+    assert scored['anomaly'].isna().all()
+
+
+def test_annual_only_history():
+    stats = build_history_stats(totals(steady_history(COLMAR, range(2015, 2024))), totals([], month=True))
+    own = stats['own']
+    assert len(own) == 1 and own.loc[0, 'n'] == 8
+    assert own['median'].dtype == np.float64 and own.loc[0, 'median'] == pytest.approx(np.log(1.05))
+
+    scored = score_anomalies(pending([(COLMAR, None, 1050.0, 1000.0), (COLMAR, None, 2000.0, 1000.0)]), stats)
+    assert scored['anomaly'].tolist() == ['green', 'red']
+    assert scored['anomaly_source'].tolist() == ['own', 'own']
+
+
+def test_monthly_row_is_scored_against_the_same_month():
+    monthly = totals(steady_history(COLMAR, range(2018, 2024), month=3, growth=1.0), month=True)
+    stats = build_history_stats(totals([]), monthly)
+    scored = score_anomalies(pending([(COLMAR, 3, 1500.0, 1000.0), (COLMAR, 4, 1500.0, 1000.0)]), stats)
+    assert scored['anomaly'].iloc[0] == 'red'
+    # No history for April: the row is left unscored.
+    assert np.isnan(scored['anomaly_score'].iloc[1])
+
+
+def test_site_without_own_history_is_scored_against_peers():
+    annual = totals(steady_history(COLMAR, range(2015, 2024)) + steady_history(NEWPORT, [2023]))
+    stats = build_history_stats(annual, totals([], month=True))
+    scored = score_anomalies(pending([(NEWPORT, None, 3000.0, 1000.0)]), stats)
+    assert np.isnan(scored['z_own'].iloc[0])
+    assert scored['anomaly_source'].iloc[0] == 'peers'
+    assert scored['anomaly'].iloc[0] == 'red'
@@ -0,0 +1,58 @@
+"""Checks emission factor resolution and the t CO2e roll-up.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import emissions
+from emissions import resolve_factors, rollup_emissions
+from schema import enforce_schema
+
+
+@pytest.fixture
+def french_kerosene(monkeypatch):
+    """Adds a France-specific kerosene factor valid from 2022."""
+    monkeypatch.setattr(emissions, 'COUNTRY_EMISSION_FACTORS', {('Kerosene', 'France'): {2022: 2.60}})
+    monkeypatch.setattr(emissions, 'FACTOR_TABLE', emissions._factor_table())
+
+
+def test_global_factor():
+    assert resolve_factors(['Kerosene'], ['France'], [2020]).tolist() == [2.54]
+
+
+def test_gwp_switches_from_ar5_to_ar6():
+    factors = resolve_factors(['Leakage R410a'] * 2, ['France'] * 2, [2023, 2024])
+    assert factors.tolist() == [1924, 2256]
+
+
+def test_unknown_category_has_no_factor():
+    assert np.isnan(resolve_factors(['Unobtainium'], ['France'], [2024])).all()
+
+
+def test_country_factor_overrides_global_from_its_first_year(french_kerosene):
+    factors = resolve_factors(
+        ['Kerosene', 'Kerosene', 'Kerosene', 'Propane'],
+        ['France', 'France', 'USA', 'France'],
+        [2021, 2023, 2023, 2023],
+    )
+    assert factors.tolist() == [2.54, 2.60, 2.54, 1.54]
+
+
+@pytest.mark.filterwarnings('error::FutureWarning')
+def test_rollup_sums_per_group(french_kerosene):
+    rows = enforce_schema(pd.DataFrame({
+        'location': ['Colmar Site (France)', 'Colmar Site (France)', 'Newport News Site (USA)', 'Colmar Site (France)'],
+        'division': ['Mining Division'] * 4,
+        'category': ['Kerosene', 'Propane', 'Kerosene', 'Kerosene'],
+        'year': [2023, 2023, 2023, 2021],
+        'value_standardized': [1000.0, 1000.0, 1000.0, 1000.0],
+    }))
+    # Rows may arrive in several chunks; partial sums must combine per group.
+    rollup = rollup_emissions([rows.iloc[:2], rows.iloc[2:]]).set_index(['year', 'location'])['t_co2e']
+    assert rollup[(2023, 'Colmar Site (France)')] == pytest.approx(2.60 + 1.54)
+    assert rollup[(2023, 'Newport News Site (USA)')] == pytest.approx(2.54)
+    assert rollup[(2021, 'Colmar Site (France)')] == pytest.approx(2.54)
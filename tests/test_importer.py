@@ -0,0 +1,100 @@
+"""Checks bulk-import validation, the error report and Excel parsing.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import io
+
+import pandas as pd
+import pytest
+
+from importer import import_file, iter_raw_chunks, validate_chunk
+from store import SubmissionStore
+
+COLMAR = 'Colmar Site (France)'
+HEADER = ['year', 'category', 'value', 'unit', 'month']
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SubmissionStore(str(tmp_path / 'import.sqlite3'))
+
+
+def raw_chunk(rows):
+    return pd.DataFrame(rows, columns=HEADER, dtype=object)
+
+
+def test_validate_chunk_reasons():
+    raw = raw_chunk([
+        ['2023', 'Kerosene', '10', 'liters', None],
+        ['2023', 'Unobtainium', '10', 'liters', None],
+        ['2023', 'Kerosene', '10', 'kg', None],
+        ['1980', 'Kerosene', '10', 'liters', None],
+        ['2023.5', 'Kerosene', '10', 'liters', None],
+        ['2023', 'Kerosene', '10', 'liters', '13'],
+        ['2023', 'Kerosene', 'inf', 'liters', None],
+        ['2023', 'Kerosene', '1e400', 'liters', None],
+        ['2023', 'Kerosene', '-1', 'liters', None],
+        ['2023', 'Kerosene', 'ten', 'liters', None],
+        ['2023', 'Kerosene', '2', 'gallons (US)', '3'],
+    ])
+    accepted, rejected = validate_chunk(raw, COLMAR, 'user_colmar', first_row=2, max_year=2024)
+
+    assert rejected['reason'].tolist() == [
+        'Unknown category',
+        'Unit not valid for category',
+        'Year must be a whole number between 1990 and 2024',
+        'Year must be a whole number between 1990 and 2024',
+        'Month must be empty or a whole number between 1 and 12',
+    ] + ['Value must be a finite, non-negative number'] * 4
+    assert rejected['row'].tolist() == list(range(3, 12))
+    assert len(accepted) == 2
+    assert accepted['month'].tolist() == [pd.NA, 3]
+    assert accepted['value_standardized'].iloc[1] == pytest.approx(2 * 3.78541)
+
+
+def test_missing_columns_are_reported():
+    with pytest.raises(ValueError, match='Missing required columns: unit'):
+        validate_chunk(pd.DataFrame({'year': ['2023'], 'category': ['Kerosene'], 'value': ['1']}), COLMAR, 'user_colmar', 2)
+
+
+def test_error_report_row_numbers_across_chunks(store):
+    csv = "year,category,value,unit\n" + "\n".join([
+        "2023,Kerosene,1,liters",      # line 2
+        "2023,Kerosene,-1,liters",     # line 3
+        "2023,Kerosene,1,liters",      # line 4
+        "2023,Unobtainium,1,liters",   # line 5
+        "2023,Kerosene,inf,liters",    # line 6
+    ])
+    result = import_file(store, io.StringIO(csv), 'site.csv', COLMAR, 'user_colmar', chunk_size=2)
+    assert (result['accepted'], result['rejected']) == (2, 3)
+    report = pd.read_csv(result['error_report'])
+    assert report['row'].tolist() == [3, 5, 6]
+    assert store.count({'location': COLMAR}) == 2
+
+
+def test_error_report_is_removed_without_rejections(store):
+    result = import_file(store, io.StringIO("year,category,value,unit\n2023,Kerosene,1,liters\n"), 'site.csv', COLMAR, 'user_colmar')
+    assert result == {'accepted': 1, 'rejected': 0, 'error_report': None}
+
+
+def test_excel_empty_cells_stay_empty(store, tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = tmp_path / 'site.xlsx'
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    sheet.append([2023, 'Kerosene', 10.5, 'liters', None])
+    sheet.append([2023, None, 3, 'liters', 4])
+    workbook.save(path)
+
+    chunk = next(iter_raw_chunks(str(path), 'site.xlsx'))
+    assert chunk['month'].isna().tolist() == [True, False]
+    assert chunk['category'].isna().tolist() == [False, True]
+
+    result = import_file(store, str(path), 'site.xlsx', COLMAR, 'user_colmar')
+    assert (result['accepted'], result['rejected']) == (1, 1)
+    report = pd.read_csv(result['error_report'])
+    assert report['category'].isna().all()
+    assert report['reason'].tolist() == ['Unknown category']
@@ -0,0 +1,33 @@
+"""Checks the per-site store configuration.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import pytest
+
+from store import SubmissionStore
+
+COLMAR = 'Colmar Site (France)'
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SubmissionStore(str(tmp_path / 'store.sqlite3'))
+
+
+def test_entry_frequencies_are_shared_and_replaced(store):
+    store.set_entry_frequencies(COLMAR, {'Kerosene': 'Monthly', 'Propane': 'Annual', 'Acetylene': 'Daily'})
+    # Another session (or server process) sees the same configuration.
+    reopened = SubmissionStore(store.path)
+    assert reopened.entry_frequencies(COLMAR) == {'Kerosene': 'Monthly', 'Acetylene': 'Daily'}
+    assert reopened.entry_frequencies('Toulouse Site (France)') == {}
+
+    store.set_entry_frequencies(COLMAR, {'Kerosene': 'Daily'})
+    assert store.entry_frequencies(COLMAR) == {'Kerosene': 'Daily'}
+
+
+def test_unknown_entry_frequency_is_rejected(store):
+    with pytest.raises(ValueError, match='Unknown entry frequency: Weekly'):
+        store.set_entry_frequencies(COLMAR, {'Kerosene': 'Weekly'})
+    assert store.entry_frequencies(COLMAR) == {}
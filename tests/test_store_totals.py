@@ -0,0 +1,108 @@
+"""Checks that the trigger-maintained totals match a fresh rebuild_totals().
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import pytest
+
+from benchmarks.synthetic import make_submissions
+from store import SubmissionStore
+
+TOTAL_TABLES = {
+    'category_year_totals': ['location', 'category', 'year'],
+    'category_period_totals': ['location', 'category', 'year', 'period_type', 'period'],
+}
+N_ROWS = 2_000
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A store filled with synthetic rows, half of them reported with a month."""
+    store = SubmissionStore(str(tmp_path / 'totals.sqlite3'))
+    store.insert_frame(make_submissions(N_ROWS, first_year=2020, seed=1, monthly_share=0.5))
+    return store
+
+
+def snapshot(store):
+    """Returns {table: {keys: (unit, totals...)}}, leaving out groups that no longer hold any row."""
+    conn = store._connect()
+    tables = {}
+    for table, keys in TOTAL_TABLES.items():
+        rows = conn.execute(
+            f"SELECT {', '.join(keys)}, unit_standardized, value_total, n_pending, n_approved, n_rejected, value_approved "
+            f"FROM {table} WHERE n_pending + n_approved + n_rejected > 0"
+        ).fetchall()
+        tables[table] = {row[:len(keys)]: row[len(keys):] for row in rows}
+    return tables
+
+
+def assert_matches_rebuild(store):
+    """Compares the incrementally maintained totals with rebuilt ones."""
+    maintained = snapshot(store)
+    store.rebuild_totals()
+    rebuilt = snapshot(store)
+    for table in TOTAL_TABLES:
+        assert maintained[table].keys() == rebuilt[table].keys(), table
+        for key, (unit, value_total, *counts, value_approved) in rebuilt[table].items():
+            m_unit, m_value_total, *m_counts, m_value_approved = maintained[table][key]
+            assert (m_unit, m_counts) == (unit, counts), (table, key)
+            assert m_value_total == pytest.approx(value_total, abs=1e-6), (table, key)
+            assert m_value_approved == pytest.approx(value_approved, abs=1e-6), (table, key)
+
+
+def pending_ids(store, limit):
+    return [row[0] for row in store._connect().execute(
+        "SELECT id FROM submissions WHERE status = 'Pending' ORDER BY id LIMIT ?", (limit,)
+    )]
+
+
+def test_insert(store):
+    assert_matches_rebuild(store)
+
+
+def test_form_submission(store):
+    form_data = {
+        'Kerosene': {'value': 10.0, 'unit': 'gallons (US)', 'month': 3},
+        'Propane': {'value': 5.0, 'unit': 'kg'},
+    }
+    store.submit_form(form_data, 'Colmar Site (France)', 2024, 'user_colmar')
+    assert_matches_rebuild(store)
+
+
+def test_status_changes(store):
+    ids = pending_ids(store, 200)
+    decisions = {entry_id: 'Approved' if i % 3 else 'Rejected' for i, entry_id in enumerate(ids)}
+    store.set_status_many(decisions, 'manager_colmar')
+    assert_matches_rebuild(store)
+    # Decisions can be revised, moving values between the approved and rejected totals.
+    store.set_status_many(dict.fromkeys(ids[:50], 'Pending'), 'manager_colmar')
+    assert_matches_rebuild(store)
+
+
+def test_moving_rows_between_periods(store):
+    with store._transaction() as conn:
+        conn.execute("UPDATE submissions SET month = (month % 12) + 1 WHERE id % 7 = 0 AND month IS NOT NULL")
+        conn.execute("UPDATE submissions SET month = NULL WHERE id % 11 = 0")
+        conn.execute("UPDATE submissions SET month = 1, year = year - 1 WHERE id % 13 = 0")
+    assert_matches_rebuild(store)
+
+
+def test_restandardize(store):
+    with store._transaction() as conn:
+        conn.execute("UPDATE submissions SET value_standardized = value_standardized * 2 WHERE id % 5 = 0")
+        conn.execute("UPDATE submissions SET unit_standardized = 'stale' WHERE id % 9 = 0")
+    changed, unknown = store.restandardize(chunk_size=300)
+    assert changed > 0 and unknown == 0
+    assert store.restandardize(chunk_size=300) == (0, 0)
+    assert_matches_rebuild(store)
+
+
+def test_delete(store):
+    with store._transaction() as conn:
+        conn.execute("DELETE FROM submissions WHERE id % 4 = 0")
+    assert_matches_rebuild(store)
+    with store._transaction() as conn:
+        conn.execute("DELETE FROM submissions")
+    assert snapshot(store) == {table: {} for table in TOTAL_TABLES}
+    assert store.years() == []
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+# --- Plausibility Bands ---
+# Absolute change vs. the previous year, in percent: below GREEN_LIMIT is green,
+# up to ORANGE_LIMIT orange, anything above red.
+GREEN_LIMIT = 10
+ORANGE_LIMIT = 25
+BAND_ICONS = {'green': '🟢', 'orange': '🟠', 'red': '🔴', 'grey': '⚪'}
+
+
+def score_plausibility(df, value_col='value_standardized', prev_col='value_prev_year'):
+    """Adds 'change_pct' and 'plausibility' columns comparing each value to the previous year.
+
+    Rows without a previous value get a NaN change and no band; a previous value of
+    zero is banded grey because the change is undefined.
+    """
+    curr = df[value_col].to_numpy(dtype=float)
+    prev = df[prev_col].to_numpy(dtype=float)
+    has_prev = ~np.isnan(prev)
+    zero_prev = has_prev & (prev == 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = np.where(has_prev & ~zero_prev, (curr - prev) / prev * 100, np.nan)
+    magnitude = np.abs(change)
+
+    band = np.select(
+        [zero_prev, magnitude < GREEN_LIMIT, magnitude <= ORANGE_LIMIT, has_prev],
+        ['grey', 'green', 'orange', 'red'],
+        default=None
+    )
+    out = df.copy()
+    out['change_pct'] = change
+    out['plausibility'] = band
+    return out
+
+
+def format_plausibility(scored):
+    """Renders the banded change as display text, e.g. '🟠 +12.3%'."""
+    text = pd.Series('N/A', index=scored.index)
+    has_band = scored['plausibility'].notna()
+    text[has_band] = scored.loc[has_band, 'plausibility'].map(BAND_ICONS) + ' N/A'
+    has_change = scored['change_pct'].notna()
+    text[has_change] = (
+        scored.loc[has_change, 'plausibility'].map(BAND_ICONS) + ' '
+        + scored.loc[has_change, 'change_pct'].map('{:+.1f}%'.format)
+    )
+    return text